@@ -32,8 +32,8 @@ if not os.getenv("GEMINI_API_KEY_STRUCTURER"):
 # -------------------------------------------------
 
 from pipeline import process_pdf
-from ml_pipeline.ingestion.pdf_extractor import extract_text_from_pdf
-from ml_pipeline.text_structurer.medical_structurer import call_gemini_structurer
+from ml_pipeline.ingestion.pdf_extractor import iter_pages, pages_to_text
+from ml_pipeline.text_structurer.medical_structurer import stream_gemini_structurer
 from ml_pipeline.text_structurer.medical_summarizer import call_gemini_summarizer
 from ml_pipeline.text_structurer.visualizer import (
     flatten_lab_reports,
@@ -81,7 +81,13 @@ if uploaded_file:
             # === Step 1: Text Extraction ===
             status_text.text("🔍 Extracting text from PDF...")
             progress.progress(10)
-            extracted_text = extract_text_from_pdf(temp_pdf_path)
+            # Stream pages so the bar moves while OCR runs (10% -> 25%).
+            page_texts = []
+            for page in iter_pages(temp_pdf_path):
+                page_texts.append(page["text"])
+                status_text.text(f"🔍 Extracting text from PDF... page {page['page']}/{page['page_count']}")
+                progress.progress(10 + int(15 * page["page"] / page["page_count"]))
+            extracted_text = pages_to_text(page_texts)
 
             extracted_output_path = os.path.join(os.path.dirname(temp_pdf_path), "extracted_text.json")
             with open(extracted_output_path, "w", encoding="utf-8") as f:
@@ -90,7 +96,16 @@ if uploaded_file:
 
             # === Step 2: Structuring ===
             status_text.text("🧠 Structuring extracted data using Gemini...")
-            structured_output = call_gemini_structurer(extracted_text)
+            # Sections stream in while Gemini is still writing (25% -> 50%).
+            received_sections = []
+
+            def show_section(event):
+                if event["type"] == "section":
+                    received_sections.append(event["key"])
+                    status_text.text(f"🧠 Structuring... received {', '.join(received_sections)}")
+                    progress.progress(min(49, 25 + 3 * len(received_sections)))
+
+            structured_output = stream_gemini_structurer(extracted_text, on_event=show_section)
             progress.progress(50)
 
             if not structured_output:
@@ -159,8 +174,8 @@ if uploaded_file:
             # === Step 3: Summarization ===
             status_text.text("🩺 Generating medical summary...")
             progress.progress(70)
-            # Summarize using the validated dict (dump to string for prompt)
-            summary = call_gemini_summarizer(json.dumps(structured_obj, indent=2))
+            # Summarize using the validated dict (serialized compactly for the prompt)
+            summary = call_gemini_summarizer(structured_obj)
 
             if summary:
                 summary_path = os.path.join(os.path.dirname(temp_pdf_path), "summary.txt")
@@ -8,11 +8,34 @@ ROOT_DIR = Path(__file__).resolve().parents[2]
 sys.path.append(str(ROOT_DIR))
 load_dotenv(ROOT_DIR / ".env")
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.routes.medical import router as medical_router
+from ml_pipeline.observability.metrics import render_cache_counters, render_prometheus
+from ml_pipeline.ingestion.extraction_cache import extraction_cache_stats
+from ml_pipeline.ingestion.pdf_extractor import ExtractionConfig
+from ml_pipeline.text_structurer.llm_cache import llm_cache_stats
+from ml_pipeline.ingestion.ocr_runtime import (
+    get_ocr_runtime,
+    ocr_preload_enabled,
+    start_background_preload,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Opt-in (OCR_PRELOAD=1): warm EasyOCR in the background so the first
+    # /medical/summarize call does not pay the model load. Same languages as
+    # extraction (OCR_LANGUAGES), so requests use the preloaded readers.
+    if ocr_preload_enabled():
+        start_background_preload(ExtractionConfig.from_env().ocr_languages)
+    yield
+
 
-app = FastAPI(title="MediVault Backend")
+app = FastAPI(title="MediVault Backend", lifespan=lifespan)
 
 app.include_router(medical_router)
 
@@ -36,3 +59,22 @@ app.add_middleware(
 @app.get("/")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    """Readiness: with OCR_PRELOAD on, 503 until the OCR reader pool is loaded."""
+    ocr = get_ocr_runtime(ExtractionConfig.from_env().ocr_languages).status()
+    is_ready = ocr["loaded"] or not ocr_preload_enabled()
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "loading", "ocr": ocr},
+    )
+
+
+@app.get("/metrics")
+def metrics():
+    """Per-stage latency / size histograms and cache hit / miss counters, in the Prometheus text format."""
+    caches = {"llm": llm_cache_stats(), "extraction": extraction_cache_stats()}
+    body = render_prometheus() + render_cache_counters(caches)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
@@ -54,7 +54,10 @@
 
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import JSONResponse
 from app.services.medical_pipeline import summarize_medical_pdf_bytes
+from app.services.job_queue import QueueFullError, get_summarize_queue
+from ml_pipeline.storage.document_store import get_document_store, is_doc_id
 
 router = APIRouter(
     prefix="/medical",
@@ -69,7 +72,43 @@ def summarize_medical(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
     try:
-        return summarize_medical_pdf_bytes(file.file.read())
+        return summarize_medical_pdf_bytes(file.file.read(), source_name=file.filename)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.post("/jobs", status_code=202)
+async def create_summarize_job(file: UploadFile = File(...)):
+    """Queue a PDF for summarization and return its job id immediately."""
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    pdf_bytes = await file.read()
+    try:
+        job_id = get_summarize_queue().submit({"pdf_bytes": pdf_bytes, "source_name": file.filename})
+    except QueueFullError as e:
+        return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": "30"})
+
+    return {"job_id": job_id, "status": "queued", "status_url": f"/medical/jobs/{job_id}"}
+
+
+@router.get("/jobs/{job_id}")
+def get_summarize_job(job_id: str):
+    """Status, current stage and (once succeeded) result of a summarization job."""
+    job = get_summarize_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/documents/{doc_id}")
+def get_document(doc_id: str, include_text: bool = False):
+    """Stored results for a document id (SHA-256 of the PDF), without re-running the pipeline."""
+    if not is_doc_id(doc_id):
+        raise HTTPException(status_code=400, detail="Document id must be a SHA-256 hex digest")
+    artifacts = ("structured", "summary", "extracted_text") if include_text else ("structured", "summary")
+    document = get_document_store().get(doc_id, artifacts)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    document["structured_data"] = document.pop("structured")
+    return document
@@ -0,0 +1,137 @@
+"""
+job_queue.py
+------------
+In-memory background job queue for long-running summarization requests.
+
+A bounded thread pool runs the jobs; job state lives in a process-local dict
+(fine for a single API process — jobs are lost on restart). Finished jobs are
+dropped after ``MEDICAL_JOB_TTL_SECONDS``.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when too many jobs are already queued or running."""
+    pass
+
+
+class JobQueue:
+    def __init__(self, job_fn, max_workers: int = 2, max_pending: int = 16, ttl_seconds: float = 3600):
+        """
+        ``job_fn(payload, set_stage, set_partial)`` does the work; ``set_stage(name)``
+        reports progress, ``set_partial(key, value)`` publishes an intermediate
+        result under ``job["partial"]``, and the return value becomes the job result.
+        """
+        self._job_fn = job_fn
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="medical-job")
+        self._max_pending = max_pending
+        self._ttl_seconds = ttl_seconds
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _set_partial(self, job_id: str, key: str, value):
+        with self._lock:
+            self._jobs[job_id]["partial"][key] = value
+
+    def _purge_expired(self):
+        cutoff = time.time() - self._ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["status"] in (STATUS_QUEUED, STATUS_RUNNING))
+
+    def submit(self, payload) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._purge_expired()
+            if self._active_count() >= self._max_pending:
+                raise QueueFullError(f"{self._max_pending} jobs already pending; retry later")
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": STATUS_QUEUED,
+                "stage": None,
+                "partial": {},
+                "result": None,
+                "error": None,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+            }
+        self._executor.submit(self._run, job_id, payload)
+        return job_id
+
+    def _run(self, job_id: str, payload):
+        self._update(job_id, status=STATUS_RUNNING, started_at=time.time())
+        try:
+            result = self._job_fn(
+                payload,
+                lambda stage: self._update(job_id, stage=stage),
+                lambda key, value: self._set_partial(job_id, key, value),
+            )
+        except Exception as e:
+            print(f"[ERROR] Job {job_id} failed: {e}")
+            self._update(job_id, status=STATUS_FAILED, error=str(e), finished_at=time.time())
+        else:
+            self._update(job_id, status=STATUS_SUCCEEDED, stage="done", result=result, finished_at=time.time())
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            job = dict(job)
+            job["partial"] = dict(job["partial"])
+            return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {"jobs": counts, "max_pending": self._max_pending}
+
+
+def _run_summarize_job(payload: dict, set_stage, set_partial):
+    # Imported here so the queue module stays importable without the ML stack.
+    from app.services.medical_pipeline import summarize_medical_pdf_bytes
+
+    return summarize_medical_pdf_bytes(
+        payload["pdf_bytes"], on_stage=set_stage, on_section=set_partial, source_name=payload.get("source_name")
+    )
+
+
+_summarize_queue = None
+_summarize_queue_lock = threading.Lock()
+
+
+def get_summarize_queue() -> JobQueue:
+    """Process-wide queue for /medical/jobs, sized by MEDICAL_JOB_WORKERS / MEDICAL_JOB_MAX_PENDING."""
+    global _summarize_queue
+    with _summarize_queue_lock:
+        if _summarize_queue is None:
+            _summarize_queue = JobQueue(
+                _run_summarize_job,
+                max_workers=int(os.getenv("MEDICAL_JOB_WORKERS", "2")),
+                max_pending=int(os.getenv("MEDICAL_JOB_MAX_PENDING", "16")),
+                ttl_seconds=float(os.getenv("MEDICAL_JOB_TTL_SECONDS", "3600")),
+            )
+        return _summarize_queue
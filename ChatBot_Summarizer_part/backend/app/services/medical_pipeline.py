@@ -1,18 +1,71 @@
-import json
+import time
 
+from ml_pipeline.ingestion.extraction_cache import sha256_hex
 from ml_pipeline.ingestion.pdf_extractor import extract_text_from_pdf
-from ml_pipeline.text_structurer.medical_structurer import call_gemini_structurer
+from ml_pipeline.storage.document_store import get_document_store
+from ml_pipeline.text_structurer.medical_structurer import call_gemini_structurer, stream_gemini_structurer
 from ml_pipeline.text_structurer.medical_summarizer import call_gemini_summarizer
 from ml_pipeline.text_structurer.utils_json import load_structured_json_maybe_repair
 
 
-def summarize_medical_pdf_bytes(pdf_bytes: bytes):
+def _section_reporter(on_section):
+    # Items arrive before their list is complete; publish the list as it grows.
+    items = {}
+
+    def on_event(event):
+        if event["type"] == "item":
+            items.setdefault(event["key"], []).append(event["value"])
+            on_section(event["key"], list(items[event["key"]]))
+        else:
+            on_section(event["key"], event["value"])
+
+    return on_event
+
+
+def summarize_medical_pdf_bytes(pdf_bytes: bytes, on_stage=None, on_section=None, source_name=None):
+    # ``on_stage(name)`` is called as each step starts (used by the job queue).
+    # ``on_section(key, value)``, if given, receives structured sections while the
+    # structurer response is still streaming.
+    # Results are kept in the document store under ``doc_id`` (GET /medical/documents/{doc_id});
+    # a PDF already processed with the current models and prompts is not re-run.
+    report_stage = on_stage or (lambda stage: None)
+    doc_id = sha256_hex(pdf_bytes)
+    store = get_document_store()
+
+    stored = store.find_result(doc_id)
+    if stored:
+        print(f"[CACHE] Document {doc_id[:12]} served from the document store.")
+        if on_section is not None:
+            for key, value in (stored["structured_data"] or {}).items():
+                on_section(key, value)
+        return {"doc_id": doc_id, **stored}
+
     # In-memory PDF avoids Windows file-lock issues with temp files.
+    report_stage("extracting")
+    start = time.perf_counter()
     extracted_text = extract_text_from_pdf(pdf_bytes)
+    timings = {"extract": time.perf_counter() - start}
 
-    structured_raw = call_gemini_structurer(extracted_text)
+    report_stage("structuring")
+    start = time.perf_counter()
+    if on_section is not None:
+        structured_raw = stream_gemini_structurer(extracted_text, on_event=_section_reporter(on_section))
+    else:
+        structured_raw = call_gemini_structurer(extracted_text)
     structured_obj = load_structured_json_maybe_repair(structured_raw)
+    timings["structure"] = time.perf_counter() - start
 
-    summary = call_gemini_summarizer(json.dumps(structured_obj, indent=2))
+    report_stage("summarizing")
+    start = time.perf_counter()
+    summary = call_gemini_summarizer(structured_obj)
+    timings["summarize"] = time.perf_counter() - start
 
-    return {"summary": summary, "structured_data": structured_obj}
+    store.save(
+        doc_id,
+        source_name=source_name,
+        timings=timings,
+        extracted_text=extracted_text,
+        structured=structured_obj,
+        summary=summary,
+    )
+    return {"doc_id": doc_id, "summary": summary, "structured_data": structured_obj}
@@ -0,0 +1,368 @@
+"""
+batch_runner.py
+---------------
+Concurrent batch processing for folders of PDFs, as a staged pipeline:
+
+    extract (process pool) -> [queue] -> structure (threads) -> [queue] -> summarize (threads)
+
+- Each stage has its own worker count; bounded queues between stages give
+  backpressure, so OCR of document N+1 overlaps Gemini latency for document N
+  without piling up extracted text in memory.
+- Set GEMINI_RPM to throttle Gemini calls with the client's process-wide rate limiter.
+- Progress is recorded in a manifest file so an interrupted backfill can be
+  resumed; files already marked done are skipped.
+- A per-file timing report (extract / structure / summarize) and per-stage
+  metrics (throughput, queue depths) are written at the end.
+
+Extracted text, structured record and summary for each PDF go to the document
+store (see ``document_store``); the manifest maps file names to document ids.
+The manifest, timing report and metrics are written to ``output_dir``.
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ml_pipeline.ingestion.extraction_cache import sha256_hex
+from ml_pipeline.ingestion.pdf_extractor import ExtractionConfig, _init_extraction_worker, extract_text_from_pdf
+from ml_pipeline.storage.document_store import DocumentStore, get_document_store
+from ml_pipeline.text_structurer.medical_structurer import call_gemini_structurer
+from ml_pipeline.text_structurer.llm_cache import llm_cache_stats
+from ml_pipeline.text_structurer.medical_summarizer import call_gemini_summarizer
+
+MANIFEST_NAME = "manifest.json"
+REPORT_NAME = "timing_report.csv"
+METRICS_NAME = "batch_metrics.json"
+
+
+# ---------------------------------------------------------------------
+# Manifest (resumable progress)
+# ---------------------------------------------------------------------
+class BatchManifest:
+    """``{pdf file name: {"status", "timings", "error", ...}}`` persisted after every update."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def is_done(self, file_name: str) -> bool:
+        return self.entries.get(file_name, {}).get("status") == "done"
+
+    def update(self, file_name: str, **fields):
+        with self._lock:
+            self.entries.setdefault(file_name, {}).update(fields)
+            # Write-then-rename so a crash never leaves a truncated manifest.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+# ---------------------------------------------------------------------
+# Stage functions
+# ---------------------------------------------------------------------
+def _extract_file(pdf_path: str):
+    """Process-pool task: returns (extracted text, seconds, document id)."""
+    start = time.perf_counter()
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+    # Serial inside the worker; the batch already parallelises across files.
+    text = extract_text_from_pdf(pdf_bytes, workers=1)
+    return text, time.perf_counter() - start, sha256_hex(pdf_bytes)
+
+
+def _structure(store: DocumentStore, item: dict):
+    """Structure stage: Gemini structuring. Returns the structured dict."""
+    start = time.perf_counter()
+    structured_output = call_gemini_structurer(item["text"])
+    if not structured_output:
+        raise RuntimeError("Structuring failed")
+    store.save(item["doc_id"], timings={"structure": time.perf_counter() - start}, structured=structured_output)
+    return structured_output
+
+
+def _summarize(store: DocumentStore, item: dict):
+    """Summarize stage: Gemini summarization."""
+    start = time.perf_counter()
+    summary = call_gemini_summarizer(item["result"])
+    if not summary:
+        raise RuntimeError("Summarization failed")
+    store.save(item["doc_id"], timings={"summarize": time.perf_counter() - start}, summary=summary)
+
+
+# ---------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------
+class StageMetrics:
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self.busy_seconds += seconds
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self, elapsed: float) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "processed": self.processed,
+                "failed": self.failed,
+                "busy_seconds": round(self.busy_seconds, 2),
+                "throughput_per_min": round(60 * self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+                # Share of the stage's worker capacity actually used.
+                "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed > 0 else 0.0,
+            }
+
+
+class QueueMetrics:
+    """Samples a stage queue's depth so peaks and averages can be reported."""
+
+    def __init__(self, q: queue.Queue):
+        self.queue = q
+        self.samples = 0
+        self.total_depth = 0
+        self.max_depth = 0
+
+    def sample(self) -> int:
+        depth = self.queue.qsize()
+        self.samples += 1
+        self.total_depth += depth
+        self.max_depth = max(self.max_depth, depth)
+        return depth
+
+    def snapshot(self) -> dict:
+        return {
+            "capacity": self.queue.maxsize,
+            "depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "mean_depth": round(self.total_depth / self.samples, 2) if self.samples else 0.0,
+        }
+
+
+# ---------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------
+def write_timing_report(manifest: BatchManifest, report_path: str):
+    with open(report_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["file", "doc_id", "status", "extract_s", "structure_s", "summarize_s", "total_s", "error"])
+        for file_name, entry in sorted(manifest.entries.items()):
+            t = entry.get("timings", {})
+            writer.writerow([
+                file_name,
+                entry.get("doc_id") or "",
+                entry.get("status"),
+                *(f"{t[k]:.2f}" if k in t else "" for k in ("extract", "structure", "summarize", "total")),
+                entry.get("error") or "",
+            ])
+
+
+def run_batch(
+    folder_path: str,
+    output_dir: str | None = None,
+    extract_workers: int | None = None,
+    structure_workers: int | None = None,
+    summarize_workers: int | None = None,
+    queue_size: int | None = None,
+    store: DocumentStore | None = None,
+) -> dict:
+    """
+    Process every PDF in ``folder_path`` through the staged pipeline. Returns
+    ``{"files": manifest entries, "metrics": per-stage / per-queue metrics}``.
+
+    Worker counts default to BATCH_EXTRACT_WORKERS (min(4, CPU count)),
+    BATCH_STRUCTURE_WORKERS (4) and BATCH_SUMMARIZE_WORKERS (2); inter-stage
+    queues hold BATCH_QUEUE_SIZE (4) documents. When GEMINI_RPM is set, API
+    throughput is capped by it regardless of worker counts. Results go to ``store`` (default:
+    ``get_document_store()``).
+    """
+    output_dir = output_dir or os.path.join(folder_path, "batch_output")
+    os.makedirs(output_dir, exist_ok=True)
+    # Conservative default: each extraction worker holds an OCR model, and torch
+    # threads are split between workers (see _init_extraction_worker).
+    extract_workers = extract_workers or int(os.getenv("BATCH_EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+    structure_workers = structure_workers or int(os.getenv("BATCH_STRUCTURE_WORKERS", "4"))
+    summarize_workers = summarize_workers or int(os.getenv("BATCH_SUMMARIZE_WORKERS", "2"))
+    queue_size = queue_size or int(os.getenv("BATCH_QUEUE_SIZE", "4"))
+    store = store or get_document_store()
+
+    manifest = BatchManifest(os.path.join(output_dir, MANIFEST_NAME))
+    pdf_files = sorted(f for f in os.listdir(folder_path) if f.lower().endswith(".pdf"))
+    todo = [f for f in pdf_files if not manifest.is_done(f)]
+    print(
+        f"[BATCH] {len(pdf_files)} PDF(s) in {folder_path}; {len(pdf_files) - len(todo)} already done, "
+        f"{len(todo)} to process (workers: {extract_workers} extract / {structure_workers} structure / "
+        f"{summarize_workers} summarize)"
+    )
+    if not todo:
+        return {"files": manifest.entries, "metrics": {}}
+
+    stages = {
+        "extract": StageMetrics("extract", extract_workers),
+        "structure": StageMetrics("structure", structure_workers),
+        "summarize": StageMetrics("summarize", summarize_workers),
+    }
+    structure_queue = queue.Queue(maxsize=queue_size)
+    summarize_queue = queue.Queue(maxsize=queue_size)
+    queues = {"structure": QueueMetrics(structure_queue), "summarize": QueueMetrics(summarize_queue)}
+
+    def fail(file_name: str, stage: str, error: Exception):
+        print(f"[ERROR] {stage} stage failed for {file_name}: {error}")
+        manifest.update(file_name, status="failed", error=f"{stage}: {error}")
+
+    def extract_stage(pool: ProcessPoolExecutor):
+        # Keep at most extract_workers files in flight; a full structure queue blocks
+        # put(), which stops new submissions (backpressure).
+        files = iter(todo)
+        in_flight = {}
+
+        def submit_next():
+            file_name = next(files, None)
+            if file_name is not None:
+                in_flight[pool.submit(_extract_file, os.path.join(folder_path, file_name))] = file_name
+
+        for _ in range(extract_workers):
+            submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_name = in_flight.pop(future)
+                # A failed save (disk full, permissions) fails this file only, not the batch.
+                try:
+                    text, extract_s, doc_id = future.result()
+                    store.save(doc_id, source_name=file_name, timings={"extract": extract_s}, extracted_text=text)
+                    manifest.update(file_name, status="extracted", doc_id=doc_id, timings={"extract": extract_s})
+                    structure_queue.put({
+                        "file_name": file_name, "doc_id": doc_id, "text": text,
+                        "timings": {"extract": extract_s},
+                    })
+                except Exception as e:
+                    stages["extract"].record(0.0, ok=False)
+                    fail(file_name, "extract", e)
+                else:
+                    stages["extract"].record(extract_s, ok=True)
+                submit_next()
+
+    def llm_stage(name: str, inbox: queue.Queue, outbox: queue.Queue | None, work):
+        while True:
+            item = inbox.get()
+            if item is None:
+                return
+            start = time.perf_counter()
+            try:
+                item["result"] = work(item)
+            except Exception as e:
+                stages[name].record(time.perf_counter() - start, ok=False)
+                fail(item["file_name"], name, e)
+                continue
+            elapsed = time.perf_counter() - start
+            stages[name].record(elapsed, ok=True)
+            item["timings"][name] = elapsed
+            if outbox is not None:
+                outbox.put(item)
+            else:
+                timings = dict(item["timings"], total=sum(item["timings"].values()))
+                manifest.update(item["file_name"], status="done", error=None, timings=timings)
+                print(f"[BATCH] Done: {item['file_name']} ({timings['total']:.2f}s of work)")
+
+    batch_start = time.perf_counter()
+    finished = threading.Event()
+
+    def monitor():
+        while not finished.wait(1.0):
+            depths = {name: q.sample() for name, q in queues.items()}
+            done = stages["summarize"].processed
+            print(
+                f"[BATCH] {done}/{len(todo)} done | queue depth: structure {depths['structure']}/{queue_size}, "
+                f"summarize {depths['summarize']}/{queue_size}"
+            )
+
+    structure_threads = [
+        threading.Thread(
+            target=llm_stage, name=f"batch-structure-{i}",
+            args=("structure", structure_queue, summarize_queue,
+                  lambda item: _structure(store, item)),
+        )
+        for i in range(structure_workers)
+    ]
+    summarize_threads = [
+        threading.Thread(
+            target=llm_stage, name=f"batch-summarize-{i}",
+            args=("summarize", summarize_queue, None,
+                  lambda item: _summarize(store, item)),
+        )
+        for i in range(summarize_workers)
+    ]
+    monitor_thread = threading.Thread(target=monitor, name="batch-monitor", daemon=True)
+    for thread in structure_threads + summarize_threads + [monitor_thread]:
+        thread.start()
+
+    # "spawn" avoids forking a parent that may already hold torch/OpenMP thread pools.
+    # Same worker setup as page-parallel extraction: torch threads split across workers
+    # (workers * threads <= cores) and the OCR reader preloaded once per worker.
+    mp_context = multiprocessing.get_context("spawn")
+    torch_threads = max(1, (os.cpu_count() or 1) // extract_workers)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=extract_workers,
+            mp_context=mp_context,
+            initializer=_init_extraction_worker,
+            initargs=(ExtractionConfig.from_env().ocr_languages, torch_threads),
+        ) as extract_pool:
+            extract_stage(extract_pool)
+    finally:
+        # Drain downstream stages in order: one sentinel per worker.
+        for _ in structure_threads:
+            structure_queue.put(None)
+        for thread in structure_threads:
+            thread.join()
+        for _ in summarize_threads:
+            summarize_queue.put(None)
+        for thread in summarize_threads:
+            thread.join()
+        finished.set()
+
+    elapsed = time.perf_counter() - batch_start
+    metrics = {
+        "elapsed_seconds": round(elapsed, 2),
+        "stages": {name: stage.snapshot(elapsed) for name, stage in stages.items()},
+        "queues": {name: q.snapshot() for name, q in queues.items()},
+        "llm_cache": llm_cache_stats(),
+    }
+    with open(os.path.join(output_dir, METRICS_NAME), "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+
+    report_path = os.path.join(output_dir, REPORT_NAME)
+    write_timing_report(manifest, report_path)
+    print(f"[TIMER] Batch of {len(todo)} file(s) completed in {elapsed:.2f} seconds")
+    for name, stage in metrics["stages"].items():
+        print(
+            f"[METRICS] {name:<9} processed={stage['processed']} failed={stage['failed']} "
+            f"throughput={stage['throughput_per_min']}/min utilization={stage['utilization']:.0%}"
+        )
+    for name, q in metrics["queues"].items():
+        print(f"[METRICS] queue {name:<9} max_depth={q['max_depth']}/{q['capacity']} mean_depth={q['mean_depth']}")
+    if metrics["llm_cache"]:
+        for kind, counts in metrics["llm_cache"]["by_kind"].items():
+            print(f"[METRICS] llm_cache {kind:<10} hits={counts['hits']} misses={counts['misses']} hit_rate={counts['hit_rate']:.0%}")
+    print(f"[INFO] Timing report saved → {report_path}")
+    return {"files": manifest.entries, "metrics": metrics}
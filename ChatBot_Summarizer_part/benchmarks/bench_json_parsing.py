@@ -0,0 +1,129 @@
+"""
+bench_json_parsing.py
+---------------------
+Tiered JSON parser vs the previous ``json.loads -> repair_json -> raw_decode``
+chain on a corpus of typical malformed LLM outputs.
+
+The corpus is built from a structurer-shaped record: clean JSON, Markdown
+fences, chatty preamble / trailing commentary, trailing commas, Python literals,
+single quotes, missing commas and a truncated answer. Files in ``--corpus-dir``
+(raw model outputs, one per file) are added to it.
+
+Usage (from ChatBot_Summarizer_part/):
+    python benchmarks/bench_json_parsing.py --repeat 20 --notes 40
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from json_repair import repair_json
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from ml_pipeline.text_structurer.utils_json import extract_json_strict, parse_json_tiered
+
+
+def legacy_parse(raw_output):
+    """The parser before tiering (bare excepts replaced so failures are counted)."""
+    try:
+        return json.loads(raw_output)
+    except Exception:
+        try:
+            return json.loads(repair_json(raw_output))
+        except Exception:
+            strict = extract_json_strict(raw_output)
+            if strict:
+                return json.loads(strict)
+    return None
+
+
+def sample_record(notes: int) -> dict:
+    return {
+        "patient_information": {"patient_name": "Jane Doe", "patient_id": "P-1029", "age": 67, "gender": "F"},
+        "admission_summary": {
+            "chief_complaint": "Shortness of breath",
+            "primary_diagnosis": "Acute decompensated heart failure",
+            "secondary_diagnoses": ["Type 2 diabetes", "CKD stage 3"],
+        },
+        "progress_notes": [
+            {
+                "date": f"2024-03-{(i % 28) + 1:02d}",
+                "subjective": "Patient reports improved breathing, mild ankle swelling.",
+                "objective": "BP 132/78, HR 84, SpO2 95% on room air.",
+                "assessment": "Improving volume status.",
+                "plan": "Continue IV furosemide, recheck BMP in the morning.",
+            }
+            for i in range(notes)
+        ],
+        "lab_reports": [
+            {
+                "report_date": "2024-03-02",
+                "test_name": "BMP",
+                "parameters": [
+                    {"name": "Sodium", "value": "134", "unit": "mmol/L", "reference_range": "135-145", "flag": "L"},
+                    {"name": "Creatinine", "value": "1.6", "unit": "mg/dL", "reference_range": "0.6-1.2", "flag": "H"},
+                ],
+            }
+        ],
+    }
+
+
+def build_corpus(notes: int, corpus_dir: str | None) -> dict:
+    pretty = json.dumps(sample_record(notes), indent=2)
+    corpus = {
+        "valid": pretty,
+        "fenced": f"```json\n{pretty}\n```",
+        "preamble": f"Here is the structured JSON you asked for:\n\n{pretty}\n\nLet me know if you need changes.",
+        "trailing_commas": pretty.replace('"\n', '",\n').replace("}\n", "},\n"),
+        "python_literals": pretty.replace("null", "None").replace("67", "67").replace('"F"', "None"),
+        "single_quotes": pretty.replace('"', "'"),
+        "missing_commas": pretty.replace('",\n', '"\n', 5),
+        "truncated": pretty[: int(len(pretty) * 0.8)],
+    }
+    if corpus_dir:
+        for path in sorted(Path(corpus_dir).glob("*")):
+            if path.is_file():
+                corpus[f"file:{path.name}"] = path.read_text(encoding="utf-8", errors="replace")
+    return corpus
+
+
+def time_parser(fn, raw, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(raw)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Parses per case (mean is reported).")
+    parser.add_argument("--notes", type=int, default=40, help="progress_notes entries in the sample record.")
+    parser.add_argument("--corpus-dir", default=None, help="Extra raw model outputs, one per file.")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.notes, args.corpus_dir)
+    print(f"\n=== JSON parsing: {len(corpus)} cases, {args.repeat} runs each ===")
+    print(f"{'case':<22}{'bytes':>9}{'legacy ms':>12}{'tiered ms':>12}{'speedup':>9}  tier")
+    legacy_total = tiered_total = 0.0
+    for name, raw in corpus.items():
+        legacy_s, legacy_value = time_parser(legacy_parse, raw, args.repeat)
+        tiered_s, (tiered_value, info) = time_parser(parse_json_tiered, raw, args.repeat)
+        legacy_total += legacy_s
+        tiered_total += tiered_s
+        tier = info["tier"] or "FAILED"
+        if legacy_value is None and tiered_value is not None:
+            tier += " (legacy failed)"
+        print(
+            f"{name:<22}{len(raw):>9}{legacy_s * 1000:>12.2f}{tiered_s * 1000:>12.2f}"
+            f"{legacy_s / tiered_s if tiered_s else 0:>8.1f}x  {tier}"
+        )
+    print(f"{'total':<31}{legacy_total * 1000:>12.2f}{tiered_total * 1000:>12.2f}"
+          f"{legacy_total / tiered_total if tiered_total else 0:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+bench_ocr_warmup.py
+-------------------
+Cold-start vs warm OCR latency for one rendered page.
+
+"Cold" is what the first request pays without preloading (reader build + OCR);
+"warm" is every request after ``OcrRuntime.preload()`` (OCR only).
+
+Usage (from ChatBot_Summarizer_part/):
+    python benchmarks/bench_ocr_warmup.py path/to/report.pdf --runs 3
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from ml_pipeline.ingestion.ocr_runtime import OcrRuntime
+from ml_pipeline.ingestion.pdf_extractor import _render_for_ocr
+
+DEFAULT_PDF = ROOT_DIR / "data" / "pdf_samples" / "Cynthia-data-1-10-30-2024.pdf"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", default=str(DEFAULT_PDF))
+    parser.add_argument("--runs", type=int, default=3, help="Warm OCR runs to average.")
+    args = parser.parse_args()
+
+    doc = fitz.open(args.pdf)
+    try:
+        image, pix, _ = _render_for_ocr(doc[0])
+
+        runtime = OcrRuntime(pool_size=1)
+        start = time.perf_counter()
+        with runtime.acquire() as reader:
+            load_done = time.perf_counter()
+            reader.readtext(image)
+        cold_total = time.perf_counter() - start
+        cold_load = load_done - start
+
+        warm = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            with runtime.acquire() as reader:
+                reader.readtext(image)
+            warm.append(time.perf_counter() - start)
+    finally:
+        doc.close()
+
+    warm_avg = sum(warm) / len(warm)
+    print(f"\n=== OCR cold start vs warm: {Path(args.pdf).name}, page 1 ===")
+    print(f"cold (load + OCR): {cold_total:8.2f}s  (reader load {cold_load:.2f}s)")
+    print(f"warm (OCR only):   {warm_avg:8.2f}s  (mean of {len(warm)})")
+    print(f"first-request penalty removed by preload: {cold_total - warm_avg:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
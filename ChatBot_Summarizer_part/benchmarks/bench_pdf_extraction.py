@@ -0,0 +1,57 @@
+"""
+bench_pdf_extraction.py
+-----------------------
+Compares serial vs page-parallel ``extract_text_from_pdf`` on a PDF.
+The extraction cache is bypassed, so every run extracts every page.
+
+Usage (from ChatBot_Summarizer_part/):
+    python benchmarks/bench_pdf_extraction.py path/to/report.pdf --workers 2 4 8
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from ml_pipeline.ingestion.pdf_extractor import extract_text_from_pdf
+
+DEFAULT_PDF = ROOT_DIR / "data" / "pdf_samples" / "Cynthia-data-1-10-30-2024.pdf"
+
+
+def _time_extraction(pdf_bytes: bytes, workers: int, repeat: int):
+    best = None
+    text = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = extract_text_from_pdf(pdf_bytes, workers=workers, use_cache=False)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", default=str(DEFAULT_PDF))
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per configuration (best time is reported).")
+    args = parser.parse_args()
+
+    pdf_bytes = Path(args.pdf).read_bytes()
+
+    serial_time, serial_text = _time_extraction(pdf_bytes, 1, args.repeat)
+    rows = [(1, serial_time, True)]
+    for workers in args.workers:
+        elapsed, text = _time_extraction(pdf_bytes, workers, args.repeat)
+        rows.append((workers, elapsed, text == serial_text))
+
+    print(f"\n=== Extraction benchmark: {Path(args.pdf).name} ===")
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8} {'same text':>10}")
+    for workers, elapsed, same in rows:
+        print(f"{workers:>8} {elapsed:>10.2f} {serial_time / elapsed:>7.2f}x {str(same):>10}")
+
+
+if __name__ == "__main__":
+    main()
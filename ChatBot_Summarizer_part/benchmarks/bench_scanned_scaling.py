@@ -0,0 +1,76 @@
+"""
+bench_scanned_scaling.py
+------------------------
+Regression benchmark for the pdfplumber fallback on scanned PDFs.
+
+Builds a synthetic image-only PDF (no text layer, so every page takes the
+pdfplumber fallback) and times extraction on growing prefixes of it. With a
+document-scoped pdfplumber handle, seconds/page should stay flat; a re-open per
+page shows up as seconds/page growing with the page count.
+
+OCR is disabled (``ocr_mode="never"``) and the extraction cache bypassed, so
+only the parsing cost is measured.
+
+Usage (from ChatBot_Summarizer_part/):
+    python benchmarks/bench_scanned_scaling.py --pages 50 100 200 300
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from ml_pipeline.ingestion.pdf_extractor import ExtractionConfig, extract_text_from_pdf
+
+# Per-page time at the largest size may be at most this multiple of the smallest.
+MAX_PER_PAGE_GROWTH = 1.5
+
+
+def build_scanned_pdf(page_count: int) -> bytes:
+    """Image-only pages, roughly what a scanner produces."""
+    scan = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 850, 1100), False)
+    scan.clear_with(235)
+    doc = fitz.open()
+    try:
+        for _ in range(page_count):
+            page = doc.new_page()
+            page.insert_image(page.rect, pixmap=scan)
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 100, 200, 300])
+    args = parser.parse_args()
+
+    config = ExtractionConfig(ocr_mode="never")
+    rows = []
+    for page_count in sorted(args.pages):
+        pdf_bytes = build_scanned_pdf(page_count)
+        start = time.perf_counter()
+        extract_text_from_pdf(pdf_bytes, workers=1, config=config, use_cache=False)
+        elapsed = time.perf_counter() - start
+        rows.append((page_count, elapsed, elapsed / page_count))
+
+    print("\n=== Scanned PDF scaling (pdfplumber fallback on every page) ===")
+    print(f"{'pages':>6} {'seconds':>9} {'ms/page':>9}")
+    for page_count, elapsed, per_page in rows:
+        print(f"{page_count:>6} {elapsed:>9.2f} {per_page * 1000:>9.2f}")
+
+    growth = rows[-1][2] / rows[0][2]
+    print(f"\nPer-page time growth {rows[0][0]} -> {rows[-1][0]} pages: {growth:.2f}x")
+    if growth > MAX_PER_PAGE_GROWTH:
+        print(f"[FAIL] Scaling is super-linear (limit {MAX_PER_PAGE_GROWTH}x).")
+        sys.exit(1)
+    print("[OK] Scaling is linear.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+bench_startup.py
+----------------
+Backend startup cost: ``python -X importtime`` of ``app.main`` and wall time
+from launching uvicorn to a healthy ``GET /``.
+
+Both are measured in fresh subprocesses, so the numbers don't depend on a CI
+runner's warm state. The run fails (exit code 1) if a heavy ML dependency is
+imported at startup or a target is missed, so it can gate a pipeline as-is.
+
+Usage (from ChatBot_Summarizer_part/):
+    python benchmarks/bench_startup.py --runs 5 --import-target 1.0 --healthy-target 3.0
+    python benchmarks/bench_startup.py --json startup.json   # keep results for tracking
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+
+# Must only load when a PDF is processed, never at boot.
+HEAVY_MODULES = ("torch", "easyocr", "cv2", "fitz", "pymupdf", "pdfplumber", "numpy")
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    # Startup must not depend on credentials or the preload.
+    for name in ("GEMINI_API_KEY_STRUCTURER", "GEMINI_API_KEY_SUMMARIZER", "OCR_PRELOAD"):
+        env.pop(name, None)
+    return env
+
+
+def measure_imports() -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"[ERROR] import app.main failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2)) / 1e6  # cumulative seconds
+    return {
+        "total_seconds": modules.get("app.main", 0.0),
+        "modules": modules,
+        "heavy_loaded": sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES and "." not in m),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_healthy(timeout: float) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise SystemExit(f"[ERROR] uvicorn exited early:\n{proc.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise SystemExit(f"[ERROR] / not healthy within {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-target", type=float, default=1.0, help="Max median import time (s).")
+    parser.add_argument("--healthy-target", type=float, default=3.0, help="Max median launch-to-healthy time (s).")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list.")
+    parser.add_argument("--json", default=None, help="Write results to this file.")
+    args = parser.parse_args()
+
+    imports = [measure_imports() for _ in range(args.runs)]
+    healthy = [measure_healthy(timeout=60) for _ in range(args.runs)]
+    import_median = statistics.median(run["total_seconds"] for run in imports)
+    healthy_median = statistics.median(healthy)
+    heavy = sorted({m for run in imports for m in run["heavy_loaded"]})
+
+    print(f"\n=== Backend startup ({args.runs} runs) ===")
+    print(f"import app.main:     median {import_median:.3f}s  (target {args.import_target:.2f}s)")
+    print(f"launch -> GET / 200: median {healthy_median:.3f}s  (target {args.healthy_target:.2f}s)")
+    print(f"heavy modules at startup: {', '.join(heavy) or 'none'}")
+    print("\nslowest imports (cumulative, last run):")
+    top = sorted(imports[-1]["modules"].items(), key=lambda item: item[1], reverse=True)[1:args.top + 1]
+    for name, seconds in top:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    failures = []
+    if heavy:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy)}")
+    if import_median > args.import_target:
+        failures.append(f"import time {import_median:.3f}s over target {args.import_target:.2f}s")
+    if healthy_median > args.healthy_target:
+        failures.append(f"time to healthy {healthy_median:.3f}s over target {args.healthy_target:.2f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "import_seconds": [round(run["total_seconds"], 4) for run in imports],
+                "healthy_seconds": [round(s, 4) for s in healthy],
+                "import_median": round(import_median, 4),
+                "healthy_median": round(healthy_median, 4),
+                "heavy_loaded": heavy,
+                "failures": failures,
+            }, f, indent=2)
+
+    for failure in failures:
+        print(f"[ERROR] {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+bench_text_normalize.py
+-----------------------
+Unicode normalization of multi-MB OCR-like text:
+
+- legacy:    the old ``clean_text`` chain, then the old ``clean_unicode`` chain
+             again on the same document in the structurer (two passes);
+- translate: one ``str.translate`` over a precomputed table (same mappings);
+- shared:    ``normalize_text`` once per document (what the pipeline does now).
+
+Cases: pure ASCII, ASCII with a non-ASCII line every ``--every`` lines (typical
+OCR output), text dense in typographic + Latin-1 characters, text that keeps
+characters outside Latin-1 (≥, →) after normalization, and the same with NFKC
+entries (fullwidth, thin spaces) present. The last two take the shared
+normalizer's vectorized scan. ``--text-file`` adds a real extracted document.
+Times are the best of ``--repeat`` runs.
+
+Usage (from ChatBot_Summarizer_part/):
+    python benchmarks/bench_text_normalize.py --mb 5 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from ml_pipeline.ingestion.text_normalize import NORMALIZATION_TABLE, normalize_text
+
+LEGACY_CLEAN_TEXT = {
+    '•': '•', '½': '1/2', 'ﬁ': 'fi', '“': '"', '”': '"',
+    '–': '-', '—': '-', '’': "'", '\xa0': ' ',
+}
+LEGACY_CLEAN_UNICODE = {'–': '-', '—': '-', '’': "'", '\xa0': ' '}
+TRANSLATE_TABLE = str.maketrans(NORMALIZATION_TABLE)
+
+LINE = "Patient stable, vitals within normal limits. BP 120/80 mmHg, HR 72, continue current plan.\n"
+UNICODE_LINE = "Dose – ½ tab “once daily”, patient’s ﬁle noted\xa0— recheck\n"
+DENSE_LINE = "Temp 37.1 °C, Vit D 25 µg, café – “noted”, BSA 1.8 m²\n"
+WIDE_LINE = "eGFR ≥ 60 mL/min, K⁺ 4.1 → stable – “noted”\n"
+NFKC_LINE = "Ｎａｍｅ：\u3000Doe, eGFR ≥ 60\u2009mL/min – ﬀ\n"
+
+
+def legacy(text: str) -> str:
+    for orig, repl in LEGACY_CLEAN_TEXT.items():
+        text = text.replace(orig, repl)
+    text = text.strip()
+    for orig, repl in LEGACY_CLEAN_UNICODE.items():
+        text = text.replace(orig, repl)
+    return text.strip()
+
+
+def translate(text: str) -> str:
+    return text.translate(TRANSLATE_TABLE).strip()
+
+
+def build_corpus(mb: float, every: int, text_file: str | None) -> dict:
+    size = int(mb * 1_000_000)
+    sparse_block = LINE * (every - 1) + UNICODE_LINE
+    corpus = {
+        "ascii": LINE * (size // len(LINE)),
+        f"1 in {every} lines": sparse_block * (size // len(sparse_block)),
+        "dense": DENSE_LINE * (size // len(DENSE_LINE)),
+        "dense, wide chars": WIDE_LINE * (size // len(WIDE_LINE)),
+        "dense, NFKC chars": NFKC_LINE * (size // len(NFKC_LINE)),
+    }
+    if text_file:
+        corpus[f"file:{Path(text_file).name}"] = Path(text_file).read_text(encoding="utf-8", errors="replace")
+    return corpus
+
+
+def time_fn(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=5.0, help="Size of each synthetic document.")
+    parser.add_argument("--every", type=int, default=50, help="One non-ASCII line per this many lines.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--text-file", default=None, help="Extracted text to add to the corpus.")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.mb, args.every, args.text_file)
+    print(f"\n=== Unicode normalization: {len(NORMALIZATION_TABLE)} mappings, best of {args.repeat} runs ===")
+    print(f"{'case':<20}{'MB':>7}{'legacy ms':>12}{'translate ms':>14}{'shared ms':>12}{'vs legacy':>11}")
+    for name, text in corpus.items():
+        assert normalize_text(text) == translate(text)
+        legacy_s = time_fn(legacy, text, args.repeat)
+        translate_s = time_fn(translate, text, args.repeat)
+        shared_s = time_fn(normalize_text, text, args.repeat)
+        print(
+            f"{name:<20}{len(text) / 1e6:>7.2f}{legacy_s * 1000:>12.1f}{translate_s * 1000:>14.1f}"
+            f"{shared_s * 1000:>12.1f}{legacy_s / shared_s if shared_s else 0:>10.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
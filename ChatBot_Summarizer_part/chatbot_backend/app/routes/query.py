@@ -12,6 +12,7 @@ from chatbot.selector.exceptions import (
 from chatbot.llm.fallback_handler import call_llm_fallback
 from chatbot.llm.phrasing_layer import phrase_response
 from chatbot.llm.response_validator import LLMValidationError
+from ml_pipeline.storage.document_store import get_document_store, is_doc_id
 
 
 import json
@@ -25,7 +26,14 @@ STRUCTURED_JSON_PATH = ROOT_DIR / "chatbot" / "data" / "structured_output.json"
 
 
 
-def load_patient_json():
+def load_patient_json(doc_id=None):
+    if doc_id:
+        if not is_doc_id(doc_id):
+            raise HTTPException(status_code=400, detail="Invalid document id")
+        structured = get_document_store().load(doc_id, "structured")
+        if structured is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return structured
     if not STRUCTURED_JSON_PATH.exists():
         raise FileNotFoundError("Structured JSON not found")
     with open(STRUCTURED_JSON_PATH, "r", encoding="utf-8") as f:
@@ -35,7 +43,7 @@ def load_patient_json():
 @router.post("/", response_model=QueryResponse)
 def run_query(request: QueryRequest):
 
-    patient_json = load_patient_json()
+    patient_json = load_patient_json(request.doc_id)
 
     raw_query = request.query
     normalized = normalize_query(raw_query)
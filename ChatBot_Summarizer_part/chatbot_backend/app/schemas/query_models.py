@@ -4,6 +4,8 @@ from typing import Dict, Any, Optional
 
 class QueryRequest(BaseModel):
     query: str
+    # Processed document to answer from (doc_id returned by /medical/summarize); defaults to the demo record.
+    doc_id: Optional[str] = None
 
 
 class QueryResponse(BaseModel):
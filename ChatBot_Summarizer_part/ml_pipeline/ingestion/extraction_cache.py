@@ -0,0 +1,189 @@
+"""
+extraction_cache.py
+-------------------
+Content-addressed on-disk cache for ``extract_text_from_pdf`` page records.
+
+Entries are keyed by the SHA-256 of the PDF bytes plus a fingerprint of the
+extraction settings that change the output (zoom, OCR languages, thresholds),
+and stored one JSON file per page so partially processed documents still
+benefit. Least-recently-used entries are evicted once the cache grows past its
+size budget.
+
+The document digest is the plain ``hashlib.sha256(pdf_bytes).hexdigest()`` the
+blockchain backend derives its mock IPFS hash from, so one digest identifies a
+file across services.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def sha256_hex(data: bytes) -> str:
+    """Hex SHA-256 digest of raw document bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def config_fingerprint(settings: dict) -> str:
+    """Stable short hash of the output-affecting extraction settings."""
+    canonical = json.dumps(settings, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _write_json_atomic(path: str, payload) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ExtractionCache:
+    """
+    Directory layout::
+
+        <root>/<sha[:2]>/<sha>-<config fingerprint>/page-0001.json
+
+    The entry directory's mtime is bumped on every read or write and drives LRU
+    eviction.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    # -----------------------------------------------------------------
+    # Lookup / store
+    # -----------------------------------------------------------------
+    def _entry_dir(self, doc_sha256: str, fingerprint: str) -> str:
+        return os.path.join(self.root, doc_sha256[:2], f"{doc_sha256}-{fingerprint}")
+
+    @staticmethod
+    def _page_path(entry_dir: str, page_num: int) -> str:
+        return os.path.join(entry_dir, f"page-{page_num + 1:04d}.json")
+
+    def load_pages(self, doc_sha256: str, fingerprint: str, page_nums) -> dict:
+        """Return ``{page_num: record}`` for the cached pages among ``page_nums`` (0-based)."""
+        entry_dir = self._entry_dir(doc_sha256, fingerprint)
+        found = {}
+        if os.path.isdir(entry_dir):
+            for page_num in page_nums:
+                try:
+                    with open(self._page_path(entry_dir, page_num), "r", encoding="utf-8") as f:
+                        found[page_num] = json.load(f)
+                except (OSError, ValueError):
+                    continue
+            if found:
+                self._touch(entry_dir)
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(page_nums) - len(found)
+        return found
+
+    def store_pages(self, doc_sha256: str, fingerprint: str, records: dict, evict: bool = True) -> None:
+        """
+        Persist ``{page_num: record}``. Evicts old entries if over budget unless
+        ``evict=False`` (callers storing page by page evict once at the end).
+        """
+        if not records:
+            return
+        entry_dir = self._entry_dir(doc_sha256, fingerprint)
+        os.makedirs(entry_dir, exist_ok=True)
+        for page_num, record in records.items():
+            _write_json_atomic(self._page_path(entry_dir, page_num), record)
+        self._touch(entry_dir)
+        if evict:
+            self.evict()
+
+    @staticmethod
+    def _touch(entry_dir: str) -> None:
+        try:
+            os.utime(entry_dir, None)
+        except OSError:
+            pass
+
+    # -----------------------------------------------------------------
+    # Eviction / stats
+    # -----------------------------------------------------------------
+    def _entries(self):
+        """Yield ``(mtime, size_bytes, path)`` for every entry directory."""
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.is_dir():
+                    continue
+                size = 0
+                for f in os.scandir(entry.path):
+                    try:
+                        size += f.stat().st_size
+                    except OSError:
+                        pass
+                yield entry.stat().st_mtime, size, entry.path
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until the cache fits ``max_bytes``. Returns entries removed."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            try:
+                os.rmdir(os.path.dirname(path))  # drop the shard dir once empty
+            except OSError:
+                pass
+            total -= size
+            removed += 1
+        if removed:
+            print(f"[CACHE] Evicted {removed} extraction cache entr{'y' if removed == 1 else 'ies'}.")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ExtractionCache | None:
+    """
+    Process-wide cache configured by ``EXTRACTION_CACHE_DIR`` (unset = caching off)
+    and ``EXTRACTION_CACHE_MAX_MB``.
+    """
+    global _default_cache
+    root = os.getenv("EXTRACTION_CACHE_DIR")
+    if not root:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache.root != root:
+            max_mb = float(os.getenv("EXTRACTION_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024)))
+            _default_cache = ExtractionCache(root, max_bytes=int(max_mb * 1024 * 1024))
+        return _default_cache
+
+
+def extraction_cache_stats() -> dict | None:
+    """Stats of the process-wide cache, or None if it was never opened."""
+    return _default_cache.stats() if _default_cache is not None else None
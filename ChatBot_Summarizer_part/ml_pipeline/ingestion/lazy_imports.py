@@ -0,0 +1,42 @@
+"""
+lazy_imports.py
+---------------
+Deferred imports for heavy dependencies (PyMuPDF, pdfplumber, numpy).
+
+``fitz = lazy_import("fitz")`` binds a placeholder that imports the real module
+on first attribute access, so importing the extraction code (and therefore
+booting the API) does not pay for them until a PDF is actually processed.
+"""
+
+import importlib
+import threading
+
+
+class LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        # Only called for attributes not found on the placeholder itself.
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
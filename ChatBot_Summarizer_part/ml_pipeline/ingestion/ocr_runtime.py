@@ -0,0 +1,153 @@
+"""
+ocr_runtime.py
+--------------
+Process-wide EasyOCR runtime: a small pool of readers that can be preloaded at
+server startup and shared safely by concurrent requests.
+
+EasyOCR readers are not safe to call from several threads at once, so each
+caller checks a reader out of the pool for the duration of its OCR batch.
+Readers are built lazily (up to ``OCR_POOL_SIZE``) unless ``preload()`` warms
+them up front.
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from ml_pipeline.observability.metrics import span
+
+
+def _use_gpu() -> bool:
+    # Use GPU only when available / requested to avoid startup crashes on CPU-only machines.
+    try:
+        import torch  # used only for CUDA availability detection
+
+        ocr_gpu_mode = os.getenv("OCR_GPU", "auto").lower()
+        if ocr_gpu_mode in ("1", "true", "yes", "gpu", "cuda"):
+            return True
+        if ocr_gpu_mode in ("0", "false", "no", "cpu"):
+            return False
+        return bool(torch.cuda.is_available())
+    except Exception:
+        return False
+
+
+class OcrRuntime:
+    def __init__(self, languages: tuple = ("en",), pool_size: int | None = None):
+        self.languages = tuple(languages)
+        self.pool_size = max(1, pool_size or int(os.getenv("OCR_POOL_SIZE", "1")))
+        self._idle = queue.Queue()
+        self._created = 0  # slots reserved, counting readers still being built
+        self._built = 0
+        self._lock = threading.Lock()
+        self._loading = False
+        self._load_seconds = None
+        self._error = None
+
+    def _build_reader(self):
+        # Lazy import so the FastAPI server can start without loading torch / OCR models.
+        import easyocr
+
+        with span("ocr.load", log=True, languages="+".join(self.languages)) as stage:
+            # `verbose=False` avoids printing EasyOCR's progress bar characters to stdout
+            # (which can crash on Windows terminals with limited encodings).
+            reader = easyocr.Reader(list(self.languages), gpu=_use_gpu(), verbose=False)
+        with self._lock:
+            self._built += 1
+            if self._load_seconds is None:
+                self._load_seconds = stage.duration
+        return reader
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                return True
+            return False
+
+    def preload(self):
+        """Build every reader in the pool now (blocking). Safe to call more than once."""
+        with self._lock:
+            self._loading = True
+        try:
+            while self._reserve_slot():
+                try:
+                    self._idle.put(self._build_reader())
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+        except Exception as e:
+            self._error = str(e)
+            print(f"[ERROR] OCR preload failed: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._loading = False
+
+    @contextmanager
+    def acquire(self, timeout: float | None = None):
+        """Check a reader out of the pool, building one if the pool is not full yet."""
+        try:
+            reader = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve_slot():
+                try:
+                    reader = self._build_reader()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                reader = self._idle.get(timeout=timeout)
+        try:
+            yield reader
+        finally:
+            self._idle.put(reader)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "languages": list(self.languages),
+                "loaded": self._built == self.pool_size,
+                "loading": self._loading,
+                "readers": self._built,
+                "idle": self._idle.qsize(),
+                "pool_size": self.pool_size,
+                "load_seconds": round(self._load_seconds, 2) if self._load_seconds is not None else None,
+                "error": self._error,
+            }
+
+
+_runtimes = {}
+_runtimes_lock = threading.Lock()
+
+
+def get_ocr_runtime(languages: tuple = ("en",)) -> OcrRuntime:
+    """Per-process runtime for a language set."""
+    languages = tuple(languages)
+    with _runtimes_lock:
+        runtime = _runtimes.get(languages)
+        if runtime is None:
+            runtime = _runtimes[languages] = OcrRuntime(languages)
+        return runtime
+
+
+def ocr_preload_enabled() -> bool:
+    return os.getenv("OCR_PRELOAD", "0").lower() in ("1", "true", "yes")
+
+
+def start_background_preload(languages: tuple = ("en",)) -> threading.Thread:
+    """Warm the runtime on a daemon thread so startup (and ``/``) is not blocked by model loading."""
+    runtime = get_ocr_runtime(languages)
+
+    def _run():
+        try:
+            runtime.preload()
+        except Exception:
+            pass  # recorded in runtime.status()["error"]
+
+    thread = threading.Thread(target=_run, name="ocr-preload", daemon=True)
+    thread.start()
+    return thread
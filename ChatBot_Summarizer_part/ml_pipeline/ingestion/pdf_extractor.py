@@ -3,131 +3,819 @@ pdf_extractor.py
 ---------------
 Module for extracting text from healthcare-related PDFs.
 Handles both text-based and scanned PDFs (hybrid extraction).
+
+PyMuPDF, pdfplumber and numpy are imported on first use (see ``lazy_imports``)
+so services that import this module start quickly.
 """
 
-import fitz  # PyMuPDF
-import pdfplumber
-import easyocr
+from __future__ import annotations
+
 import io
-import numpy as np
+import multiprocessing
+import multiprocessing.util
 import os
+import threading
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
 
-# Lazy-load EasyOCR so the FastAPI server can start without downloading OCR models.
-_easyocr_reader = None
+from ml_pipeline.ingestion.extraction_cache import (
+    ExtractionCache,
+    config_fingerprint,
+    get_default_cache,
+    sha256_hex,
+)
+from ml_pipeline.ingestion.lazy_imports import lazy_import
+from ml_pipeline.ingestion.ocr_runtime import get_ocr_runtime
+from ml_pipeline.ingestion.text_dedupe import novel_ocr_text
+from ml_pipeline.ingestion.text_normalize import normalize_text
+from ml_pipeline.observability.metrics import record_stage, span
 
+fitz = lazy_import("fitz")  # PyMuPDF
+pdfplumber = lazy_import("pdfplumber")
+np = lazy_import("numpy")
 
-def _get_easyocr_reader():
-    global _easyocr_reader
-    if _easyocr_reader is not None:
-        return _easyocr_reader
 
-    # Use GPU only when available / requested to avoid startup crashes on CPU-only machines.
-    try:
-        import torch  # used only for CUDA availability detection
+def _source_dpi(page: fitz.Page, area: fitz.Rect) -> float | None:
+    """
+    Native resolution of the scan behind ``area``: the highest effective DPI among
+    embedded images covering at least half of it, or None for vector/text content.
+    """
+    area_size = area.width * area.height
+    best = None
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"])
+        overlap = bbox & area
+        if overlap.is_empty or bbox.width <= 0 or overlap.width * overlap.height < 0.5 * area_size:
+            continue
+        dpi = info["width"] / (bbox.width / 72)
+        best = dpi if best is None else max(best, dpi)
+    return best
 
-        ocr_gpu_mode = os.getenv("OCR_GPU", "auto").lower()
-        if ocr_gpu_mode in ("1", "true", "yes", "gpu", "cuda"):
-            use_gpu = True
-        elif ocr_gpu_mode in ("0", "false", "no", "cpu"):
-            use_gpu = False
-        else:
-            use_gpu = bool(torch.cuda.is_available())
-    except Exception:
-        use_gpu = False
 
-    # `verbose=False` avoids printing EasyOCR's progress bar characters to stdout
-    # (which can crash on Windows terminals with limited encodings).
-    _easyocr_reader = easyocr.Reader(["en"], gpu=use_gpu, verbose=False)
-    return _easyocr_reader
+def _render_for_ocr(
+    page: fitz.Page,
+    target_dpi: float = 150,
+    max_pixels: int = 12_000_000,
+    grayscale: bool = False,
+    clip: fitz.Rect | None = None,
+) -> tuple[np.ndarray, fitz.Pixmap, float]:
+    """
+    Render a PDF page (or the ``clip`` region of it) for EasyOCR (no Poppler / pdf2image).
 
-def _page_pixmap_to_rgb_np(page: fitz.Page, zoom: float = 2.0) -> np.ndarray:
-    """Render a PDF page to an RGB image for EasyOCR (no Poppler / pdf2image)."""
-    mat = fitz.Matrix(zoom, zoom)
-    pix = page.get_pixmap(matrix=mat, alpha=False)
+    The DPI is ``target_dpi``, lowered to the native DPI of an underlying scan (no
+    point upsampling it) and further so the image stays under ``max_pixels``
+    (large-format pages). Returns ``(image, pixmap, dpi)``: ``image`` is a zero-copy
+    view of the pixmap samples (H x W for grayscale, H x W x 3 for RGB), so keep
+    ``pixmap`` referenced for as long as ``image`` is used.
+    """
+    area = fitz.Rect(clip) if clip is not None else page.rect
+    dpi = float(target_dpi)
+    source_dpi = _source_dpi(page, area)
+    if source_dpi:
+        dpi = max(72.0, min(dpi, source_dpi))
+    pixels = (area.width * dpi / 72) * (area.height * dpi / 72)
+    if pixels > max_pixels:
+        dpi *= (max_pixels / pixels) ** 0.5
+
+    zoom = dpi / 72
+    colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=False, clip=clip)
+    if pix.n not in (1, 3):
+        raise ValueError(f"Unexpected pixmap components: {pix.n}")
     h, w = pix.height, pix.width
-    arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(h, w, pix.n)
-    if pix.n == 4:
-        return arr[:, :, :3]
-    if pix.n == 3:
-        return arr
-    if pix.n == 1:
-        g = arr.squeeze(axis=2)
-        return np.stack([g, g, g], axis=-1)
-    raise ValueError(f"Unexpected pixmap components: {pix.n}")
+    samples = np.frombuffer(pix.samples_mv, dtype=np.uint8)
+    if pix.stride != w * pix.n:
+        # Padded rows: view with explicit strides instead of copying.
+        samples = np.lib.stride_tricks.as_strided(samples, shape=(h, w * pix.n), strides=(pix.stride, 1))
+    image = samples.reshape(h, w) if pix.n == 1 else samples.reshape(h, w, 3)
+    return image, pix, dpi
 
 
 def clean_text(text: str) -> str:
-    """Clean extracted text by fixing unicode anomalies common in medical PDFs."""
-    replacements = {
-        '\u2022': '•',
-        '\u00bd': '1/2',
-        '\ufb01': 'fi',
-        '\u201c': '"',
-        '\u201d': '"',
-        '\u2013': '-',
-        '\u2014': '-',
-        '\u2019': "'",
-        '\xa0': ' ',
+    """Clean extracted text by fixing unicode anomalies common in medical PDFs (see ``text_normalize``)."""
+    return normalize_text(text)
+
+def _read_pdf_bytes(pdf_path_or_bytes: str | bytes) -> bytes:
+    """Return raw PDF bytes from either a file path or a bytes object."""
+    if isinstance(pdf_path_or_bytes, bytes):
+        return pdf_path_or_bytes
+    pdf_path = pdf_path_or_bytes
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"File not found: {pdf_path}")
+    with open(pdf_path, "rb") as f:
+        return f.read()
+
+
+class PdfExtractionContext:
+    """
+    Document-scoped handles for one extraction run.
+
+    The fitz document is opened once up front; the pdfplumber document is opened on
+    the first sparse page and then reused, so scanned PDFs are parsed once instead of
+    once per page. Use as a context manager (or call ``close()``) to release both.
+    """
+
+    def __init__(self, pdf_bytes: bytes):
+        self.pdf_bytes = pdf_bytes
+        self.doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        self._plumber_pdf = None
+
+    @property
+    def page_count(self) -> int:
+        return len(self.doc)
+
+    def plumber_page(self, page_num: int):
+        if self._plumber_pdf is None:
+            self._plumber_pdf = pdfplumber.open(io.BytesIO(self.pdf_bytes))
+        return self._plumber_pdf.pages[page_num]
+
+    def close(self):
+        if self._plumber_pdf is not None:
+            self._plumber_pdf.close()
+            self._plumber_pdf = None
+        if not self.doc.is_closed:
+            self.doc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------------------------------------------------------------------
+# Adaptive OCR policy
+# ---------------------------------------------------------------------
+OCR_MODES = ("auto", "always", "never")
+
+# Page methods recorded in the per-page details.
+METHOD_TEXT = "text"      # text layer only, OCR skipped
+METHOD_OCR = "ocr"        # no usable text layer, OCR only
+METHOD_HYBRID = "hybrid"  # text layer + OCR
+
+
+@dataclass(frozen=True)
+class ExtractionConfig:
+    """
+    Knobs for per-page extraction.
+
+    ``ocr_mode``: "auto" picks text / ocr / hybrid per page from the heuristics below,
+    "always" OCRs every page (legacy behaviour), "never" uses the text layer only.
+    """
+    ocr_mode: str = "auto"
+    # Text layers with fewer words trigger the pdfplumber fallback and count as "no text".
+    min_text_words: int = 10
+    # A page with at least this many words is considered born-digital...
+    dense_text_words: int = 50
+    # ...if they fill it: text-layer characters per square inch (a typed header on a
+    # large or scanned page is sparse; a full page of body text is ~30)...
+    min_text_density: float = 4.0
+    # ...unless images cover more than this fraction of the page (scanned inserts).
+    max_image_coverage: float = 0.25
+    # Rendered pages / regions sent to EasyOCR together; also the most renders held in memory.
+    ocr_batch_pages: int = 4
+    # Text boxes per recognizer forward pass.
+    ocr_recognizer_batch_size: int = 16
+    # OCR render resolution; capped by the scan's own DPI and by render_max_pixels.
+    render_dpi: float = 150
+    render_max_pixels: int = 12_000_000
+    # Single-channel renders: a third of the memory, and EasyOCR recognises on grey anyway.
+    render_grayscale: bool = False
+    ocr_languages: tuple = ("en",)
+    # Hybrid pages (auto mode) OCR only their embedded images, not the whole page...
+    region_ocr: bool = True
+    # ...ignoring images smaller than this fraction of the page (bullets, logos).
+    min_region_fraction: float = 0.01
+    # Hybrid pages keep only the OCR text not already in the text layer (see ``text_dedupe``).
+    ocr_dedupe: bool = True
+    dedupe_shingle_words: int = 4
+    dedupe_min_novel_words: int = 2
+
+    @classmethod
+    def from_env(cls) -> "ExtractionConfig":
+        ocr_mode = os.getenv("OCR_MODE", cls.ocr_mode).lower()
+        if ocr_mode not in OCR_MODES:
+            raise ValueError(f"OCR_MODE must be one of {OCR_MODES}, got {ocr_mode!r}")
+        return cls(
+            ocr_mode=ocr_mode,
+            min_text_words=int(os.getenv("OCR_MIN_TEXT_WORDS", cls.min_text_words)),
+            dense_text_words=int(os.getenv("OCR_DENSE_TEXT_WORDS", cls.dense_text_words)),
+            min_text_density=float(os.getenv("OCR_MIN_TEXT_DENSITY", cls.min_text_density)),
+            max_image_coverage=float(os.getenv("OCR_MAX_IMAGE_COVERAGE", cls.max_image_coverage)),
+            ocr_batch_pages=max(1, int(os.getenv("OCR_BATCH_PAGES", cls.ocr_batch_pages))),
+            ocr_recognizer_batch_size=max(
+                1, int(os.getenv("OCR_RECOGNIZER_BATCH_SIZE", cls.ocr_recognizer_batch_size))
+            ),
+            render_dpi=float(os.getenv("OCR_RENDER_DPI", cls.render_dpi)),
+            render_max_pixels=int(os.getenv("OCR_RENDER_MAX_PIXELS", cls.render_max_pixels)),
+            render_grayscale=os.getenv("OCR_RENDER_GRAYSCALE", "0").lower() in ("1", "true", "yes"),
+            ocr_languages=tuple(
+                lang.strip() for lang in os.getenv("OCR_LANGUAGES", ",".join(cls.ocr_languages)).split(",")
+                if lang.strip()
+            ),
+            region_ocr=os.getenv("OCR_REGIONS", "1").lower() not in ("0", "false", "no"),
+            min_region_fraction=float(os.getenv("OCR_MIN_REGION_FRACTION", cls.min_region_fraction)),
+            ocr_dedupe=os.getenv("OCR_DEDUPE", "1").lower() not in ("0", "false", "no"),
+            dedupe_shingle_words=max(1, int(os.getenv("OCR_DEDUPE_SHINGLE", cls.dedupe_shingle_words))),
+            dedupe_min_novel_words=max(1, int(os.getenv("OCR_DEDUPE_MIN_NOVEL", cls.dedupe_min_novel_words))),
+        )
+
+    def cache_fingerprint(self) -> str:
+        """Hash of the settings that change extracted text (batch sizes excluded)."""
+        return config_fingerprint({
+            "ocr_mode": self.ocr_mode,
+            "min_text_words": self.min_text_words,
+            "dense_text_words": self.dense_text_words,
+            "min_text_density": self.min_text_density,
+            "max_image_coverage": self.max_image_coverage,
+            "render_dpi": self.render_dpi,
+            "render_max_pixels": self.render_max_pixels,
+            "render_grayscale": self.render_grayscale,
+            "ocr_languages": list(self.ocr_languages),
+            "region_ocr": self.region_ocr,
+            "min_region_fraction": self.min_region_fraction,
+            "ocr_dedupe": self.ocr_dedupe,
+            "dedupe_shingle_words": self.dedupe_shingle_words,
+            "dedupe_min_novel_words": self.dedupe_min_novel_words,
+        })
+
+
+def _image_coverage(page: fitz.Page) -> float:
+    """Fraction of the page area covered by embedded images (overlaps counted once per image)."""
+    page_rect = page.rect
+    page_area = page_rect.width * page_rect.height
+    if page_area <= 0:
+        return 0.0
+    covered = 0.0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"]) & page_rect
+        if not bbox.is_empty:
+            covered += bbox.width * bbox.height
+    return min(1.0, covered / page_area)
+
+
+def _image_regions(page: fitz.Page, min_fraction: float) -> list[fitz.Rect]:
+    """Bounding boxes of embedded images worth OCR'ing, top-to-bottom, without duplicates."""
+    page_rect = page.rect
+    min_area = min_fraction * page_rect.width * page_rect.height
+    regions = []
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"]) & page_rect
+        if bbox.is_empty or bbox.width * bbox.height < min_area:
+            continue
+        # Skip images drawn inside one we already OCR (repeated or nested placements).
+        if any(bbox in other for other in regions):
+            continue
+        regions = [other for other in regions if other not in bbox] + [bbox]
+    return sorted(regions, key=lambda r: (r.y0, r.x0))
+
+
+def _choose_method(words: int, text_density: float, image_coverage: float, config: ExtractionConfig) -> str:
+    if config.ocr_mode == "never":
+        return METHOD_TEXT
+    if config.ocr_mode == "always":
+        return METHOD_HYBRID
+    if words < config.min_text_words:
+        return METHOD_OCR
+    if (
+        words >= config.dense_text_words
+        and text_density >= config.min_text_density
+        and image_coverage <= config.max_image_coverage
+    ):
+        return METHOD_TEXT
+    return METHOD_HYBRID
+
+
+def _analyze_page(ctx: PdfExtractionContext, page_num: int, config: ExtractionConfig) -> dict:
+    """
+    Run text-layer extraction and the pdfplumber fallback for a single page and decide
+    its method. Returns the per-page record used for ``return_details``; OCR output is
+    filled in later by ``_finish_page``.
+    """
+    page_start = time.perf_counter()
+    timings = {}
+    page = ctx.doc[page_num]
+    print(f"[INFO] Processing Page {page_num+1}/{ctx.page_count}")
+
+    # Step 1: Direct text extraction
+    t0 = time.perf_counter()
+    text_layer = page.get_text().strip()
+    text_source = "pymupdf"
+    timings["text_layer"] = time.perf_counter() - t0
+
+    # Step 2: Fallback to pdfplumber for better structure
+    if len(text_layer.split()) < config.min_text_words:
+        print("[INFO] Falling back to pdfplumber for richer extraction.")
+        t0 = time.perf_counter()
+        plumber_page = ctx.plumber_page(page_num)
+        alt_text = plumber_page.extract_text() or ""
+        # Drop the page's parsed layout so memory stays flat on long documents.
+        plumber_page.close()
+        timings["pdfplumber"] = time.perf_counter() - t0
+        if alt_text:
+            text_layer = alt_text
+            text_source = "pdfplumber"
+
+    # Step 3: Decide whether OCR is worth it for this page
+    words = len(text_layer.split())
+    page_area_sq_in = (page.rect.width * page.rect.height) / (72 * 72)
+    text_density = len(text_layer) / page_area_sq_in if page_area_sq_in else 0.0
+    image_coverage = _image_coverage(page)
+    method = _choose_method(words, text_density, image_coverage, config)
+    timings["analyze"] = time.perf_counter() - page_start
+
+    return {
+        "page": page_num + 1,
+        "method": method,
+        "words": words,
+        "text_density": round(text_density, 2),
+        "image_coverage": round(image_coverage, 4),
+        "text_layer": text_layer,
+        "text_source": text_source,
+        "ocr_text": "",
+        "text": "",
+        "timings": timings,
     }
-    for orig, repl in replacements.items():
-        text = text.replace(orig, repl)
-    return text.strip()
 
-def extract_text_from_pdf(pdf_path_or_bytes: str | bytes) -> str:
+
+def _dedupe_ocr(record: dict, ocr_text: str, config: ExtractionConfig) -> str:
+    """OCR text of a hybrid page minus what its text layer already contains."""
+    if not config.ocr_dedupe:
+        return ocr_text
+    t0 = time.perf_counter()
+    novel = novel_ocr_text(
+        record["text_layer"], ocr_text, config.dedupe_shingle_words, config.dedupe_min_novel_words
+    )
+    timings = record["timings"]
+    timings["dedupe"] = timings.get("dedupe", 0.0) + time.perf_counter() - t0
+    dedupe = record.setdefault("ocr_dedupe", {"ocr_chars": 0, "kept_chars": 0})
+    dedupe["ocr_chars"] += len(ocr_text)
+    dedupe["kept_chars"] += len(novel)
+    return novel
+
+
+def _finish_page(record: dict, config: ExtractionConfig) -> dict:
+    """Merge text layer and OCR output according to the page method."""
+    method = record["method"]
+    segments = record.pop("_segments", None)
+    if method == METHOD_TEXT:
+        record["text"] = record["text_layer"]
+    elif method == METHOD_OCR:
+        record["text"] = record["ocr_text"]
+    elif segments is not None:
+        # Region OCR: interleave text blocks and OCR'd images by position on the page.
+        record["ocr_text"] = "\n".join(seg["text"] for seg in segments if seg["source"] == "ocr" and seg["text"])
+        for seg in segments:
+            if seg["source"] == "ocr" and seg["text"]:
+                seg["text"] = _dedupe_ocr(record, seg["text"], config)
+        segments.sort(key=lambda seg: (round(seg["bbox"][1]), seg["bbox"][0]))
+        record["text"] = "\n".join(seg["text"] for seg in segments if seg["text"])
+    else:
+        novel = _dedupe_ocr(record, record["ocr_text"], config)
+        record["text"] = record["text_layer"] + "\n" + novel if novel else record["text_layer"]
+    timings = record["timings"]
+    # "analyze" already covers text_layer / pdfplumber; OCR work happens after it.
+    timings["total"] = (
+        timings.pop("analyze") + timings.get("render", 0.0) + timings.get("ocr", 0.0) + timings.get("dedupe", 0.0)
+    )
+    record["timings"] = {k: round(v, 4) for k, v in timings.items()}
+    return record
+
+
+def _ocr_lines(results: list) -> str:
+    """
+    EasyOCR ``(box, text, confidence)`` results as text, one line per row of boxes
+    (a box joins the row above when its vertical centre lies within that row),
+    left to right. Keeping rows lets ``novel_ocr_text`` match text-layer lines.
+    """
+    boxes = sorted(
+        (min(y for _, y in box), max(y for _, y in box), min(x for x, _ in box), text)
+        for box, text, _ in results
+    )
+    rows = []  # [top, bottom, [(left, text), ...]]
+    for top, bottom, left, text in boxes:
+        if rows and (top + bottom) / 2 <= rows[-1][1]:
+            rows[-1][2].append((left, text))
+        else:
+            rows.append([top, bottom, [(left, text)]])
+    return "\n".join(" ".join(text for _, text in sorted(row[2])) for row in rows)
+
+
+def _ocr_images(images: list[np.ndarray], config: ExtractionConfig) -> list[str]:
+    """
+    OCR a batch of rendered pages / regions. Same-sized images (the common case: pages of one
+    document rendered at one DPI) go through ``readtext_batched`` together so the
+    detector sees a real batch; odd sizes fall back to ``readtext``.
+    """
+    texts = [""] * len(images)
+    by_shape = {}
+    for i, image in enumerate(images):
+        by_shape.setdefault(image.shape, []).append(i)
+
+    with get_ocr_runtime(config.ocr_languages).acquire() as reader:
+        for indices in by_shape.values():
+            if len(indices) == 1:
+                batch_results = [reader.readtext(images[indices[0]], batch_size=config.ocr_recognizer_batch_size)]
+            else:
+                batch_results = reader.readtext_batched(
+                    [images[i] for i in indices], batch_size=config.ocr_recognizer_batch_size
+                )
+            for i, results in zip(indices, batch_results):
+                texts[i] = _ocr_lines(results)
+    return texts
+
+
+def _render_jobs(page: fitz.Page, record: dict, config: ExtractionConfig) -> list[tuple]:
+    """
+    Render what needs OCR on a page: the image regions of a hybrid page when region
+    OCR applies, otherwise the whole page. Returns ``(record, slot, image, pixmap)``
+    jobs; ``slot`` indexes ``record["_segments"]`` for regions and is None for pages.
+    """
+    render = dict(
+        target_dpi=config.render_dpi,
+        max_pixels=config.render_max_pixels,
+        grayscale=config.render_grayscale,
+    )
+    regions = []
+    if record["method"] == METHOD_HYBRID and config.ocr_mode == "auto" and config.region_ocr:
+        regions = _image_regions(page, config.min_region_fraction)
+
+    if not regions:
+        image, pix, dpi = _render_for_ocr(page, **render)
+        record["render_dpi"] = round(dpi, 1)
+        record["ocr_pixels"] = pix.width * pix.height
+        return [(record, None, image, pix)]
+
+    if record["text_source"] == "pymupdf":
+        # Same text as record["text_layer"], split into positioned blocks.
+        segments = [
+            {"source": "text", "bbox": list(block[:4]), "text": block[4].strip()}
+            for block in page.get_text("blocks")
+            if block[6] == 0
+        ]
+    else:
+        # The pdfplumber fallback has no block positions: keep it whole, above the regions.
+        segments = [{"source": "text", "bbox": list(page.rect), "text": record["text_layer"]}]
+    jobs = []
+    for region in regions:
+        image, pix, dpi = _render_for_ocr(page, clip=region, **render)
+        segments.append({"source": "ocr", "bbox": list(region), "text": ""})
+        jobs.append((record, len(segments) - 1, image, pix))
+        record["render_dpi"] = round(dpi, 1)
+    record["_segments"] = segments
+    record["ocr_regions"] = len(regions)
+    record["ocr_pixels"] = sum(pix.width * pix.height for _, _, _, pix in jobs)
+    return jobs
+
+
+def _extract_pages(ctx: PdfExtractionContext, page_nums, config: ExtractionConfig):
+    """
+    Yield finished page records in page order.
+
+    Pages (or page regions) that need OCR are rendered and parked in a buffer bounded
+    by ``config.ocr_batch_pages``; when it fills, the whole batch is OCR'd at once and
+    every record up to that point is released. At most one batch of renders is
+    alive at any time, whatever the document length.
+    """
+    pending = deque()  # analysed records, in page order, not yet yielded
+    ocr_jobs = []  # (record, slot, image, pixmap backing the image) for pending OCR work
+
+    def flush():
+        if ocr_jobs:
+            print(f"[INFO] Performing OCR with EasyOCR on a batch of {len(ocr_jobs)} image(s).")
+            t0 = time.perf_counter()
+            texts = _ocr_images([image for _, _, image, _ in ocr_jobs], config)
+            per_image = (time.perf_counter() - t0) / len(ocr_jobs)
+            for (record, slot, _, _), text in zip(ocr_jobs, texts):
+                if slot is None:
+                    record["ocr_text"] = text
+                else:
+                    record["_segments"][slot]["text"] = text
+                record["timings"]["ocr"] = record["timings"].get("ocr", 0.0) + per_image
+                record["ocr_batch"] = len(ocr_jobs)
+            ocr_jobs.clear()
+        while pending:
+            yield _finish_page(pending.popleft(), config)
+
+    for page_num in page_nums:
+        record = _analyze_page(ctx, page_num, config)
+        pending.append(record)
+        if record["method"] == METHOD_TEXT:
+            if not ocr_jobs:
+                yield from flush()
+            continue
+
+        # OCR extraction for scanned content (render via PyMuPDF)
+        t0 = time.perf_counter()
+        ocr_jobs.extend(_render_jobs(ctx.doc[page_num], record, config))
+        record["timings"]["render"] = time.perf_counter() - t0
+        if len(ocr_jobs) >= config.ocr_batch_pages:
+            yield from flush()
+
+    yield from flush()
+
+
+# ---------------------------------------------------------------------
+# Page-parallel extraction (process pool)
+# ---------------------------------------------------------------------
+# One long-lived "spawn" pool per process, created on first use: starting workers
+# and loading EasyOCR in them costs seconds, so it is paid once, not per document.
+# The PDF goes to workers through shared memory (one copy per document, not one
+# per task); each worker keeps the extraction context of the last document it saw.
+_worker_ctx = None
+_worker_doc = None
+_worker_ctx_close = None
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+
+def _init_extraction_worker(ocr_languages: tuple, torch_threads: int):
+    # Keep workers * torch threads <= cores; oversubscription makes OCR slower.
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+    except Exception:
+        pass
+    # Build the reader once per worker; if it fails here, OCR retries lazily.
+    try:
+        get_ocr_runtime(ocr_languages).preload()
+    except Exception as e:
+        print(f"[WARN] OCR preload in extraction worker failed: {e}")
+
+
+def _worker_context(doc_sha256: str, shm_name: str, size: int) -> PdfExtractionContext:
+    global _worker_ctx, _worker_doc, _worker_ctx_close
+    if _worker_doc != doc_sha256:
+        if _worker_ctx_close is not None:
+            _worker_ctx_close()
+            _worker_ctx = _worker_doc = _worker_ctx_close = None
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            pdf_bytes = bytes(shm.buf[:size])
+        finally:
+            shm.close()
+        _worker_ctx = PdfExtractionContext(pdf_bytes)
+        _worker_doc = doc_sha256
+        # atexit does not run in pool workers; multiprocessing finalizers do.
+        _worker_ctx_close = multiprocessing.util.Finalize(_worker_ctx, _worker_ctx.close, exitpriority=10)
+    return _worker_ctx
+
+
+def _extract_chunk_in_worker(
+    doc_sha256: str, shm_name: str, size: int, config: ExtractionConfig, page_nums: list[int]
+) -> list[dict]:
+    return list(_extract_pages(_worker_context(doc_sha256, shm_name, size), page_nums, config))
+
+
+def _extraction_pool(workers: int, ocr_languages: tuple) -> ProcessPoolExecutor:
+    """The shared pool, replaced only when the worker count or OCR languages change."""
+    global _pool, _pool_key
+    key = (workers, tuple(ocr_languages))
+    with _pool_lock:
+        if _pool is not None and _pool_key != key:
+            _pool.shutdown(wait=False)  # work already queued on it still completes
+            _pool = None
+        if _pool is None:
+            torch_threads = max(1, (os.cpu_count() or 1) // workers)
+            # "spawn" avoids forking a parent that may already hold torch/OpenMP thread pools.
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_extraction_worker,
+                initargs=(key[1], torch_threads),
+            )
+            _pool_key = key
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool (a worker died) so the next document starts a fresh one."""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is pool:
+            _pool = _pool_key = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def resolve_extraction_workers(workers: int | None = None) -> int:
+    """
+    Number of processes used for page-parallel extraction.
+    ``None`` reads ``PDF_EXTRACT_WORKERS`` (default 1 = serial); ``0`` means one per CPU.
+    """
+    if workers is None:
+        workers = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _iter_pages_parallel(
+    pdf_bytes: bytes, doc_sha256: str, page_nums: list[int], workers: int, config: ExtractionConfig
+):
+    """Yield page records from the shared process pool, in page order, as each chunk completes."""
+    pool = _extraction_pool(workers, config.ocr_languages)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(pdf_bytes)))
+    try:
+        shm.buf[:len(pdf_bytes)] = pdf_bytes
+        # Hand out runs of consecutive pages so each worker can still batch its OCR.
+        chunk = config.ocr_batch_pages
+        chunks = [page_nums[i:i + chunk] for i in range(0, len(page_nums), chunk)]
+        futures = [
+            pool.submit(_extract_chunk_in_worker, doc_sha256, shm.name, len(pdf_bytes), config, pages)
+            for pages in chunks
+        ]
+        try:
+            # Collected in submission order, so pages come back in order.
+            for future in futures:
+                yield from future.result()
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+            # Workers must be done reading the bytes before the segment goes away.
+            wait(futures)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _record_page_metrics(record: dict):
+    # Page steps may run in worker processes, so they are timed there and
+    # recorded here from the returned record.
+    timings = record["timings"]
+    record_stage("pdf.text_layer", timings.get("text_layer", 0.0))
+    for step in ("pdfplumber", "render", "ocr", "dedupe"):
+        if step in timings:
+            record_stage(f"pdf.{step}", timings[step], pages=1)
+    record_stage("pdf.page", timings.get("total", 0.0))
+
+
+def _iter_pages(
+    pdf_bytes: bytes,
+    doc_sha256: str,
+    workers: int,
+    config: ExtractionConfig,
+    cache: ExtractionCache | None,
+):
+    """Yield every page record in order, serving cached pages and extracting the rest."""
+    fingerprint = config.cache_fingerprint()
+
+    # Open from memory; the context closes fitz / pdfplumber so handles are released promptly.
+    with PdfExtractionContext(pdf_bytes) as ctx:
+        page_count = ctx.page_count
+        cached = cache.load_pages(doc_sha256, fingerprint, range(page_count)) if cache else {}
+        missing = [page_num for page_num in range(page_count) if page_num not in cached]
+        if cached:
+            print(f"[CACHE] {len(cached)}/{page_count} pages served from extraction cache.")
+
+        if workers > 1 and len(missing) > 1:
+            print(f"[INFO] Extracting {len(missing)} pages with {workers} worker processes.")
+            extracted = _iter_pages_parallel(pdf_bytes, doc_sha256, missing, workers, config)
+        else:
+            extracted = _extract_pages(ctx, missing, config)
+
+        try:
+            for page_num in range(page_count):
+                record = cached.get(page_num)
+                if record is None:
+                    record = next(extracted)
+                    _record_page_metrics(record)
+                    if cache:
+                        cache.store_pages(doc_sha256, fingerprint, {page_num: record}, evict=False)
+                record["cached"] = page_num in cached
+                record["page_count"] = page_count
+                yield record
+        finally:
+            extracted.close()
+            if cache and missing:
+                cache.evict()
+
+
+def iter_pages(
+    pdf_path_or_bytes: str | bytes,
+    workers: int | None = None,
+    config: ExtractionConfig | None = None,
+    cache: ExtractionCache | None = None,
+    use_cache: bool = True,
+):
+    """
+    Stream extraction page by page. Yields one record per page, in page order, as
+    soon as it is done (OCR pages are released per OCR batch)::
+
+        {"page", "page_count", "method", "text_layer", "ocr_text", "text",
+         "timings", "cached", ...}
+
+    Arguments are the same as ``extract_text_from_pdf``. Records are not cleaned;
+    pass the collected records to ``pages_to_text`` for the final document text.
+    """
+    pdf_bytes = _read_pdf_bytes(pdf_path_or_bytes)
+    if cache is None and use_cache:
+        cache = get_default_cache()
+    yield from _iter_pages(
+        pdf_bytes,
+        sha256_hex(pdf_bytes),
+        resolve_extraction_workers(workers),
+        config or ExtractionConfig.from_env(),
+        cache if use_cache else None,
+    )
+
+
+def pages_to_text(pages) -> str:
+    """
+    Join page records (or their ``text`` strings) into the cleaned document text.
+    Pages are separated by a form feed so downstream chunking can split on page boundaries.
+    """
+    return clean_text("\n\f".join(page if isinstance(page, str) else page["text"] for page in pages))
+
+
+def _report_dedupe(ocr_chars: int, kept_chars: int, text_chars: int):
+    # ~4 characters per token, as in the prompt estimates.
+    removed = ocr_chars - kept_chars
+    before = text_chars + removed
+    print(
+        f"[METRICS] OCR dedupe kept {kept_chars}/{ocr_chars} OCR chars on hybrid pages; "
+        f"document ~{(before + 3) // 4} -> ~{(text_chars + 3) // 4} tokens "
+        f"(-{100 * removed / before if before else 0:.1f}%)"
+    )
+
+
+def extract_text_from_pdf(
+    pdf_path_or_bytes: str | bytes,
+    workers: int | None = None,
+    config: ExtractionConfig | None = None,
+    return_details: bool = False,
+    cache: ExtractionCache | None = None,
+    use_cache: bool = True,
+) -> str | dict:
     """
     Extract text from a PDF file path or raw PDF bytes.
     - Uses PyMuPDF for quick text extraction.
     - Falls back to pdfplumber if text layer is sparse.
-    - Uses EasyOCR for scanned pages.
+    - Uses EasyOCR for scanned pages, as decided per page by ``config.ocr_mode``
+      (defaults to ``ExtractionConfig.from_env()``).
+
+    ``workers`` > 1 shards pages across a process pool shared by every call in the
+    process (see ``resolve_extraction_workers``); text is reassembled in page order.
+
+    Page records are served from ``cache`` (default: ``get_default_cache()``, enabled
+    by ``EXTRACTION_CACHE_DIR``) when the same bytes were extracted with the same
+    settings before; only missing pages are extracted. ``use_cache=False`` bypasses it.
+
+    With ``return_details=True`` a dict ``{"text": ..., "sha256": ..., "pages": [...]}``
+    is returned, where each page record carries the chosen method, the heuristics
+    that drove it, per-step timings and whether it came from the cache.
+
+    Use ``iter_pages`` to consume pages as they finish instead of waiting for all.
 
     Prefer passing ``bytes`` from APIs so nothing on disk is locked on Windows
     while PyMuPDF / Poppler runs (avoids WinError 32 on temp file cleanup).
     """
-    start_time = time.time()
-    full_text = ""
+    pdf_bytes = _read_pdf_bytes(pdf_path_or_bytes)
+    if cache is None and use_cache:
+        cache = get_default_cache()
+    doc_sha256 = sha256_hex(pdf_bytes)
 
-    if isinstance(pdf_path_or_bytes, bytes):
-        pdf_bytes = pdf_path_or_bytes
-    else:
-        pdf_path = pdf_path_or_bytes
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"File not found: {pdf_path}")
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
-
-    # Open from memory; always close doc so handles are released promptly.
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    try:
-        for page_num, page in enumerate(doc):
-            print(f"[INFO] Processing Page {page_num+1}/{len(doc)}")
-
-            # Step 1: Direct text extraction
-            text_layer = page.get_text().strip()
-
-            # Step 2: Fallback to pdfplumber for better structure
-            if len(text_layer.split()) < 10:
-                print("[INFO] Falling back to pdfplumber for richer extraction.")
-                with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-                    alt_text = pdf.pages[page_num].extract_text() or ""
-                if alt_text:
-                    text_layer = alt_text
-
-            # Step 3: OCR extraction for scanned content (render via PyMuPDF)
-            image = _page_pixmap_to_rgb_np(page)
-            print("[INFO] Performing OCR with EasyOCR.")
-            results = _get_easyocr_reader().readtext(image)
-            ocr_text = ' '.join([result[1] for result in results])
-
-            # Step 4: Merge
-            page_text = text_layer + "\n" + ocr_text
-            full_text += page_text + "\n"
-
-        cleaned_text = clean_text(full_text)
-        print(f"[TIMER] Extraction completed in {time.time()-start_time:.2f} seconds")
-        return cleaned_text
-    finally:
-        doc.close()
+    pages = []
+    page_texts = []
+    methods = []
+    ocr_chars = kept_chars = 0
+    with span("pdf.extract", log=True, bytes=len(pdf_bytes)) as stage:
+        for record in _iter_pages(
+            pdf_bytes,
+            doc_sha256,
+            resolve_extraction_workers(workers),
+            config or ExtractionConfig.from_env(),
+            cache if use_cache else None,
+        ):
+            page_texts.append(record["text"])
+            methods.append(record["method"])
+            dedupe = record.get("ocr_dedupe")
+            if dedupe:
+                ocr_chars += dedupe["ocr_chars"]
+                kept_chars += dedupe["kept_chars"]
+            if return_details:
+                pages.append(record)
+
+        cleaned_text = pages_to_text(page_texts)
+        stage.set(pages=len(methods))
+        print(
+            f"[INFO] Page methods: {methods.count(METHOD_TEXT)} text, "
+            f"{methods.count(METHOD_OCR)} ocr, {methods.count(METHOD_HYBRID)} hybrid"
+        )
+        if ocr_chars:
+            _report_dedupe(ocr_chars, kept_chars, len(cleaned_text))
+    if return_details:
+        return {"text": cleaned_text, "sha256": doc_sha256, "pages": pages}
+    return cleaned_text
 
 if __name__ == "__main__":
     import json
@@ -0,0 +1,87 @@
+"""
+text_dedupe.py
+--------------
+Drop OCR text that repeats what the page's text layer already says.
+
+Hybrid pages are OCR'd in addition to their text layer, so on born-digital pages
+the merged text used to contain every sentence twice. ``novel_ocr_text`` keeps
+only the OCR content that is not covered by the text layer:
+
+1. Lines: an OCR line whose normalized words equal a text-layer line is dropped
+   (catches short headers / labels that are too short to shingle).
+2. Shingles: every run of ``shingle`` consecutive normalized words in the text
+   layer is hashed into a set; an OCR word is covered when any shingle that
+   contains it is in the set. Maximal runs of uncovered words are kept
+   (sliced from the original OCR text, so spacing and punctuation survive);
+   runs shorter than ``min_novel_words`` are treated as OCR noise around a
+   misread word and dropped.
+
+Normalization is case-insensitive and ignores punctuation, so OCR differences
+like "Name:" vs "Name" or "mg/dL" vs "mg dl" still match.
+"""
+
+import re
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _words(text: str) -> list[str]:
+    return [word.lower() for word in _WORD_RE.findall(text)]
+
+
+def _shingles(words: list[str], size: int) -> set:
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _novel_runs(line: str, reference_words: str, shingles: set, size: int, min_words: int) -> list[str]:
+    matches = list(_WORD_RE.finditer(line))
+    words = [match.group().lower() for match in matches]
+    if len(words) < size:
+        # Too short to shingle: covered if it appears verbatim in the reference.
+        return [] if f" {' '.join(words)} " in reference_words else [line.strip()]
+
+    covered = [False] * len(words)
+    for start in range(len(words) - size + 1):
+        if tuple(words[start:start + size]) in shingles:
+            for i in range(start, start + size):
+                covered[i] = True
+
+    runs = []
+    i = 0
+    while i < len(words):
+        if covered[i]:
+            i += 1
+            continue
+        j = i
+        while j < len(words) and not covered[j]:
+            j += 1
+        if j - i >= min_words or (i == 0 and j == len(words)):
+            runs.append(line[matches[i].start():matches[j - 1].end()])
+        i = j
+    return runs
+
+
+def novel_ocr_text(reference: str, ocr_text: str, shingle: int = 4, min_novel_words: int = 2) -> str:
+    """
+    Return the parts of ``ocr_text`` not already present in ``reference`` (the text
+    layer), one kept run per line. Returns ``ocr_text`` unchanged when the reference
+    is empty.
+    """
+    reference_lines = [_words(line) for line in reference.splitlines()]
+    reference_flat = [word for words in reference_lines for word in words]
+    if not reference_flat or not ocr_text.strip():
+        return ocr_text
+
+    known_lines = {tuple(words) for words in reference_lines if words}
+    shingles = _shingles(reference_flat, shingle)
+    reference_words = f" {' '.join(reference_flat)} "
+
+    kept = []
+    for line in ocr_text.splitlines():
+        words = _words(line)
+        if not words or tuple(words) in known_lines:
+            continue
+        kept.extend(_novel_runs(line, reference_words, shingles, shingle, min_novel_words))
+    return "\n".join(kept)
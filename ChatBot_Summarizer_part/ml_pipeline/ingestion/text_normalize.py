@@ -0,0 +1,120 @@
+"""
+text_normalize.py
+-----------------
+The one Unicode normalizer for extracted text (``pdf_extractor.clean_text``) and
+LLM payloads (``utils_json.clean_unicode``).
+
+``NORMALIZATION_TABLE`` is built once at import: the hand-picked replacements
+below plus the NFKC forms of characters where NFKC is safe for clinical text
+(ligatures, fullwidth ASCII, typographic spaces). Full NFKC is deliberately not
+applied: it would turn "m²" into "m2" and "µg" into "μg".
+
+Entries are applied with ``str.replace``, and only for characters that occur
+in the text:
+
+- the characters the old ``clean_text`` / ``clean_unicode`` chains handled,
+  plus the Latin-1 entries, are checked one by one until the text is pure
+  ASCII (``str.isascii`` is O(1)); typical OCR output is done here;
+- everything else in the table is outside Latin-1, so it is only looked for
+  when the text still has such characters, with one vectorized pass over its
+  UTF-16 code units (numpy) that returns the ones present.
+
+``str.translate`` is avoided: it does a dict lookup per character as soon as
+the text contains any non-ASCII character, which is an order of magnitude
+slower on multi-MB documents; see ``benchmarks/bench_text_normalize.py``.
+
+The text is normalized once per document, in ``pages_to_text``; the structurer
+takes that text as-is.
+"""
+
+import unicodedata
+
+from ml_pipeline.ingestion.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+REPLACEMENTS = {
+    '\u00bd': '1/2',
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2018': "'",
+    '\u2019': "'",
+    '\u2010': '-',
+    '\u2011': '-',
+    '\u2012': '-',
+    '\u2013': '-',
+    '\u2014': '-',
+    '\u2015': '-',
+    '\u2212': '-',
+    '\xa0': ' ',
+    # Invisible characters that split words for the tokenizer.
+    '\u200b': '',
+    '\u200c': '',
+    '\u200d': '',
+    '\u2060': '',
+    '\ufeff': '',
+    '\u00ad': '',
+}
+
+# Code point ranges whose NFKC form is a plain-ASCII equivalent.
+_NFKC_SAFE = (
+    range(0xFB00, 0xFB07),  # ligatures: ff fi fl ffi ffl st
+    range(0x2000, 0x200B),  # en / em / thin / hair spaces
+    (0x202F, 0x205F, 0x3000),  # narrow no-break, math and ideographic spaces
+    range(0xFF01, 0xFF5F),  # fullwidth ASCII punctuation, digits and letters
+)
+
+
+def _build_table() -> dict:
+    # Hand-picked replacements win over the NFKC form.
+    table = dict(REPLACEMENTS)
+    for code_points in _NFKC_SAFE:
+        for code_point in code_points:
+            char = chr(code_point)
+            table.setdefault(char, unicodedata.normalize("NFKC", char))
+    return table
+
+
+NORMALIZATION_TABLE = _build_table()
+
+# Checked one by one, most common in OCR output first.
+_COMMON = ('\u00bd', '\ufb01', '\u201c', '\u201d', '\u2013', '\u2014', '\u2019', '\xa0', '\u00ad')
+_COMMON_ITEMS = tuple((char, NORMALIZATION_TABLE[char]) for char in _COMMON)
+# The rest of the table: all above Latin-1, found with one scan in _present_wide_chars().
+_WIDE_TABLE = {char: repl for char, repl in NORMALIZATION_TABLE.items() if char not in _COMMON}
+_WIDE_MIN = min(map(ord, _WIDE_TABLE))
+_wide_codes = None  # sorted uint16 array of _WIDE_TABLE code points, built on first use
+
+
+def _is_latin1(text: str) -> bool:
+    # Fails at the first character above U+00FF, so this is cheap either way.
+    try:
+        text.encode("latin-1")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _present_wide_chars(text: str) -> list[str]:
+    """``_WIDE_TABLE`` characters that occur in ``text``, from one pass over its UTF-16 code units."""
+    global _wide_codes
+    if _wide_codes is None:
+        _wide_codes = np.array(sorted(map(ord, _WIDE_TABLE)), dtype=np.uint16)
+    codes = np.frombuffer(text.encode("utf-16-le", "surrogatepass"), dtype=np.uint16)
+    wide = np.compress(codes >= _WIDE_MIN, codes)
+    counts = np.bincount(wide, minlength=0x10000)[_wide_codes]
+    return [chr(code) for code in _wide_codes[counts > 0].tolist()]
+
+
+def normalize_text(text: str) -> str:
+    """Apply ``NORMALIZATION_TABLE`` and strip surrounding whitespace."""
+    for char, replacement in _COMMON_ITEMS:
+        # O(1): replace() narrows the string once its last non-ASCII character is gone.
+        if text.isascii():
+            return text.strip()
+        if char in text:
+            text = text.replace(char, replacement)
+    if not text.isascii() and not _is_latin1(text):
+        for char in _present_wide_chars(text):
+            text = text.replace(char, _WIDE_TABLE[char])
+    return text.strip()
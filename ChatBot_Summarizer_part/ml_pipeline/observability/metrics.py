@@ -0,0 +1,208 @@
+"""
+metrics.py
+----------
+Stage spans and Prometheus-style histograms for the summarizer pipeline.
+
+Every stage is wrapped in ``span(stage, **attributes)``::
+
+    with span("gemini.http", model=MODEL_NAME, bytes=len(prompt)) as s:
+        ...
+        s.set(retries=attempt - 1)
+
+On exit the span records its duration in ``medivault_stage_duration_seconds``
+(labels ``stage``, ``status``); numeric size attributes (pages, bytes, tokens,
+chunks) go to ``medivault_stage_<attr>`` histograms and ``retries`` to a counter.
+``render_prometheus()`` returns everything in the Prometheus text format for the
+backend's ``/metrics`` endpoint, and ``render_cache_counters()`` adds the hit /
+miss totals the caches keep themselves. Metrics are per process.
+"""
+
+import bisect
+import math
+import threading
+import time
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 25_000,
+                50_000, 100_000, 250_000, 1_000_000)
+SIZE_ATTRIBUTES = ("pages", "bytes", "tokens", "chunks")
+_INF_LABEL = 'le="+Inf"'
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(labelvalues, [0] * len(self.buckets) + [0.0, 0])
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, _INF_LABEL)} {values[-1]}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {values[-2]}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {values[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_label_text(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, documentation, labelnames, buckets))
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, documentation, labelnames))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "medivault_stage_duration_seconds", "Duration of each pipeline stage.", ("stage", "status")
+)
+STAGE_RETRIES = REGISTRY.counter(
+    "medivault_stage_retries_total", "Retries performed inside a pipeline stage.", ("stage",)
+)
+
+
+def _size_histogram(attribute: str) -> Histogram:
+    return REGISTRY.histogram(
+        f"medivault_stage_{attribute}", f"Size of the work handled by a stage ({attribute}).",
+        ("stage",), SIZE_BUCKETS,
+    )
+
+
+class Span:
+    def __init__(self, stage: str, log: bool = False, **attributes):
+        self.stage = stage
+        self.log = log
+        self.attributes = dict(attributes)
+        self.duration = None
+        self._start = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._start
+        record_stage(self.stage, self.duration, error=exc_type is not None, **self.attributes)
+        if self.log:
+            details = " ".join(f"{key}={value}" for key, value in self.attributes.items())
+            print(f"[TIMER] {self.stage} {self.duration:.2f}s {details}".rstrip())
+        return False
+
+
+def span(stage: str, log: bool = False, **attributes) -> Span:
+    """Time a pipeline stage; ``log=True`` also prints a ``[TIMER]`` line."""
+    return Span(stage, log=log, **attributes)
+
+
+def record_stage(stage: str, seconds: float, error: bool = False, **attributes):
+    """Record a stage timed elsewhere (e.g. page timings measured in a worker process)."""
+    STAGE_SECONDS.observe(seconds, stage, "error" if error else "ok")
+    for attribute in SIZE_ATTRIBUTES:
+        value = attributes.get(attribute)
+        if isinstance(value, (int, float)):
+            _size_histogram(attribute).observe(value, stage)
+    retries = attributes.get("retries")
+    if retries:
+        STAGE_RETRIES.inc(retries, stage)
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
+
+
+def render_cache_counters(caches: dict) -> str:
+    """
+    ``{cache name: stats() dict or None}`` as ``medivault_cache_hits_total`` /
+    ``medivault_cache_misses_total`` (labels ``cache``, ``kind``). Per-kind counts
+    (``by_kind``) are used when the cache has them, else ``kind="all"``.
+    """
+    hits = Counter("medivault_cache_hits_total", "Cache lookups served from the cache.", ("cache", "kind"))
+    misses = Counter("medivault_cache_misses_total", "Cache lookups that missed.", ("cache", "kind"))
+    for cache, stats in caches.items():
+        if not stats:
+            continue
+        for kind, counts in (stats.get("by_kind") or {"all": stats}).items():
+            hits.inc(counts["hits"], cache, kind)
+            misses.inc(counts["misses"], cache, kind)
+    return "\n".join(hits.render() + misses.render()) + "\n"
@@ -0,0 +1,181 @@
+"""
+document_store.py
+-----------------
+Content-addressed store for processed documents: extracted text, structured
+record and summary, looked up by document id instead of re-running the pipeline.
+
+The document id is the SHA-256 of the PDF bytes (``extraction_cache.sha256_hex``),
+the digest the extraction cache and the blockchain backend already use. Layout::
+
+    <root>/<id[:2]>/<id>/extracted_text.txt
+                        structured.json
+                        summary.txt
+                        metadata.json
+
+Every file is written to a temp file and renamed into place, and metadata.json
+is rewritten after the artifacts it lists, so readers never see a half-written
+file. Metadata records the source file name, models, ``PROMPT_VERSION``,
+per-stage timings and artifact sizes; ``find_result`` only returns results
+produced by the current models, prompts and prompt settings.
+
+- ``DOCUMENT_STORE_DIR``  root directory (default ``data/documents`` in this project)
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from ml_pipeline.text_structurer.config import (
+    STRUCTURER_MODEL,
+    SUMMARIZER_MODEL,
+    schema_pruning_enabled,
+    summary_prompt_format,
+)
+from ml_pipeline.text_structurer.prompt_builder import PROMPT_VERSION
+
+DEFAULT_ROOT = Path(__file__).resolve().parents[2] / "data" / "documents"
+
+ARTIFACT_FILES = {
+    "extracted_text": "extracted_text.txt",
+    "structured": "structured.json",
+    "summary": "summary.txt",
+}
+METADATA_FILE = "metadata.json"
+
+_DOC_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_doc_id(value: str) -> bool:
+    return bool(_DOC_ID_RE.match(value or ""))
+
+
+def pipeline_info() -> dict:
+    """Models, prompt version and prompt settings results are produced with."""
+    return {
+        "prompt_version": PROMPT_VERSION,
+        "structurer_model": STRUCTURER_MODEL,
+        "summarizer_model": SUMMARIZER_MODEL,
+        "structurer_schema_pruning": schema_pruning_enabled(),
+        "summary_prompt_format": summary_prompt_format(),
+    }
+
+
+def _write_atomic(path: str, data: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class DocumentStore:
+    def __init__(self, root: str):
+        self.root = str(root)
+        # Serializes metadata read-modify-write within the process (batch stages
+        # save the same document from different threads).
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def doc_dir(self, doc_id: str) -> str:
+        if not is_doc_id(doc_id):
+            raise ValueError(f"Invalid document id: {doc_id!r}")
+        return os.path.join(self.root, doc_id[:2], doc_id)
+
+    # -----------------------------------------------------------------
+    # Store
+    # -----------------------------------------------------------------
+    def save(self, doc_id: str, source_name: str | None = None, timings: dict | None = None, **artifacts) -> dict:
+        """
+        Persist any of ``extracted_text``, ``structured`` (dict) and ``summary`` for
+        ``doc_id`` and merge ``timings`` (stage -> seconds) into its metadata.
+        Artifacts passed as None are left as they are. Returns the metadata.
+        """
+        unknown = set(artifacts) - set(ARTIFACT_FILES)
+        if unknown:
+            raise ValueError(f"Unknown artifact(s): {sorted(unknown)}")
+        doc_dir = self.doc_dir(doc_id)
+        os.makedirs(doc_dir, exist_ok=True)
+
+        now = time.time()
+        written = {}
+        for name, value in artifacts.items():
+            if value is None:
+                continue
+            data = json.dumps(value, indent=4, ensure_ascii=False) if name == "structured" else value
+            _write_atomic(os.path.join(doc_dir, ARTIFACT_FILES[name]), data)
+            written[name] = {"file": ARTIFACT_FILES[name], "bytes": len(data.encode("utf-8")), "saved": now}
+
+        with self._lock:
+            metadata = self.metadata(doc_id) or {"doc_id": doc_id, "created": now, "artifacts": {}, "timings": {}}
+            metadata["updated"] = now
+            metadata["pipeline"] = pipeline_info()
+            if source_name:
+                metadata["source_name"] = source_name
+            metadata["artifacts"].update(written)
+            metadata["timings"].update({stage: round(seconds, 4) for stage, seconds in (timings or {}).items()})
+            _write_atomic(os.path.join(doc_dir, METADATA_FILE), json.dumps(metadata, indent=2))
+        return metadata
+
+    # -----------------------------------------------------------------
+    # Lookup
+    # -----------------------------------------------------------------
+    def metadata(self, doc_id: str) -> dict | None:
+        try:
+            with open(os.path.join(self.doc_dir(doc_id), METADATA_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, doc_id: str, name: str):
+        """One artifact (``structured`` as a dict), or None if it was never stored."""
+        try:
+            with open(os.path.join(self.doc_dir(doc_id), ARTIFACT_FILES[name]), "r", encoding="utf-8") as f:
+                return json.load(f) if name == "structured" else f.read()
+        except (OSError, ValueError):
+            return None
+
+    def get(self, doc_id: str, artifacts=("structured", "summary")) -> dict | None:
+        """``{"doc_id", "metadata", <artifact>: ...}`` or None for an unknown document."""
+        metadata = self.metadata(doc_id)
+        if metadata is None:
+            return None
+        document = {"doc_id": doc_id, "metadata": metadata}
+        for name in artifacts:
+            document[name] = self.load(doc_id, name)
+        return document
+
+    def find_result(self, doc_id: str) -> dict | None:
+        """
+        ``{"summary", "structured_data"}`` when the document was fully processed
+        with the current models and prompt version, else None (re-run it).
+        """
+        metadata = self.metadata(doc_id)
+        if not metadata or metadata.get("pipeline") != pipeline_info():
+            return None
+        structured = self.load(doc_id, "structured")
+        summary = self.load(doc_id, "summary")
+        if structured is None or not summary:
+            return None
+        return {"summary": summary, "structured_data": structured}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_document_store() -> DocumentStore:
+    """Process-wide store rooted at ``DOCUMENT_STORE_DIR``."""
+    global _default_store
+    root = os.getenv("DOCUMENT_STORE_DIR") or str(DEFAULT_ROOT)
+    with _default_store_lock:
+        if _default_store is None or _default_store.root != root:
+            _default_store = DocumentStore(root)
+        return _default_store
@@ -0,0 +1,127 @@
+# text_structurer/chunking.py
+"""
+Split long extracted documents into structurer-sized chunks and merge the
+partial JSON results back into one record.
+
+Splitting prefers page breaks (``\\f``, inserted by ``pages_to_text``) and
+section headers, then paragraphs and lines, and only hard-cuts a single
+oversized line. Merging is deterministic (chunk order):
+
+- ``progress_notes`` and ``lab_reports`` are concatenated;
+- other lists are unioned, keeping first-seen order;
+- null / empty scalars are filled from later chunks, first non-null value wins;
+- placeholder entries whose fields are all null are dropped.
+"""
+
+import json
+import re
+
+PAGE_BREAK = "\f"
+CONCAT_LIST_KEYS = {"progress_notes", "lab_reports"}
+
+_SECTION_KEYWORDS = (
+    r"admission|chief complaint|history|physical exam(?:ination)?|review of systems|assessment|plan|"
+    r"progress notes?|lab(?:oratory)?(?: results?| reports?)?|investigations|medications?|allergies|"
+    r"discharge(?: summary| instructions| medications)?|hospital course|diagnos[ie]s|impression|follow[- ]up"
+)
+# A short line that is either a known section keyword (optionally "Xyz:") or ALL CAPS.
+SECTION_HEADER_RE = re.compile(
+    rf"^[ \t]*(?:(?i:{_SECTION_KEYWORDS})\b[^\n:.]{{0,40}}:?|[A-Z][A-Z0-9 /&(),.-]{{3,60}}:?)[ \t]*$",
+    re.MULTILINE,
+)
+
+
+# ---------------------------------------------------------------------
+# Splitting
+# ---------------------------------------------------------------------
+def _split_sections(page: str) -> list[str]:
+    starts = [m.start() for m in SECTION_HEADER_RE.finditer(page) if m.group().strip()]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [page[a:b] for a, b in zip(starts, starts[1:] + [len(page)]) if page[a:b].strip()]
+
+
+def _split_oversized(segment: str, max_chars: int) -> list[str]:
+    """Break one segment over ``max_chars`` on paragraphs, then lines, then hard cuts."""
+    for separator in ("\n\n", "\n"):
+        parts = segment.split(separator)
+        pieces = [p for p in [p + separator for p in parts[:-1]] + [parts[-1]] if p]
+        # A trailing separator alone does not split the segment (and would recurse forever).
+        if len(pieces) > 1:
+            out = []
+            for piece in pieces:
+                out.extend(_split_oversized(piece, max_chars) if len(piece) > max_chars else [piece])
+            return out
+    return [segment[i:i + max_chars] for i in range(0, len(segment), max_chars)]
+
+
+def split_into_chunks(text: str, max_chars: int) -> list[str]:
+    """Pack page/section segments greedily into chunks of at most ``max_chars``."""
+    segments = []
+    for page in text.split(PAGE_BREAK):
+        for section in _split_sections(page):
+            segments.extend(_split_oversized(section, max_chars) if len(section) > max_chars else [section])
+
+    chunks, current = [], ""
+    for segment in segments:
+        if current and len(current) + len(segment) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += segment
+    if current.strip():
+        chunks.append(current)
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+
+# ---------------------------------------------------------------------
+# Merging
+# ---------------------------------------------------------------------
+def _is_empty(value) -> bool:
+    if value is None or value == "" or value == [] or value == {}:
+        return True
+    if isinstance(value, dict):
+        return all(_is_empty(v) for v in value.values())
+    if isinstance(value, list):
+        return all(_is_empty(v) for v in value)
+    return False
+
+
+def _canonical(value) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def _merge_lists(key: str, base: list, extra: list) -> list:
+    items = [item for item in extra if not _is_empty(item)]
+    if key in CONCAT_LIST_KEYS:
+        return base + items
+    seen = {_canonical(item) for item in base}
+    merged = list(base)
+    for item in items:
+        marker = _canonical(item)
+        if marker not in seen:
+            seen.add(marker)
+            merged.append(item)
+    return merged
+
+
+def _merge_into(base: dict, extra: dict) -> dict:
+    for key, value in extra.items():
+        current = base.get(key)
+        if isinstance(value, dict) and (current is None or isinstance(current, dict)):
+            base[key] = _merge_into(current if current is not None else {}, value)
+        elif isinstance(value, list) and (current is None or isinstance(current, list)):
+            base[key] = _merge_lists(key, current or [], value)
+        elif _is_empty(current) and not _is_empty(value):
+            base[key] = value
+        elif key not in base:
+            base[key] = value
+    return base
+
+
+def merge_structured(parts: list[dict]) -> dict:
+    """Deterministically merge per-chunk structurer outputs, in chunk order."""
+    merged = {}
+    for part in parts:
+        if isinstance(part, dict):
+            _merge_into(merged, json.loads(json.dumps(part)))  # deep copy, inputs stay untouched
+    return merged
@@ -0,0 +1,23 @@
+# text_structurer/config.py
+"""
+Models and prompt settings that decide what the structurer and summarizer produce.
+
+Kept free of third-party imports: the document store reads these to tell whether
+a stored result is still current, and is imported by services (chatbot_backend)
+that do not install the Gemini client stack.
+"""
+
+import os
+
+STRUCTURER_MODEL = "gemini-2.5-flash"
+SUMMARIZER_MODEL = "gemini-2.5-flash"
+
+
+def schema_pruning_enabled() -> bool:
+    """STRUCTURER_SCHEMA_PRUNING: ask only for the sections the document mentions (default on)."""
+    return os.getenv("STRUCTURER_SCHEMA_PRUNING", "1") != "0"
+
+
+def summary_prompt_format() -> str:
+    """SUMMARY_PROMPT_FORMAT: json (minified, default) / kv / pretty."""
+    return os.getenv("SUMMARY_PROMPT_FORMAT", "json")
@@ -0,0 +1,419 @@
+# text_structurer/gemini_client.py
+"""
+Shared Gemini REST client used by the structurer and the summarizer.
+
+- One pooled keep-alive ``requests.Session`` per process (sync) and one
+  ``httpx.AsyncClient`` per client instance (async), so calls reuse TLS
+  connections instead of opening a new one each time.
+- Per-call connect/read timeouts.
+- Unified retry policy: 429 / 5xx / network errors are retried with exponential
+  backoff and full jitter, and a server ``Retry-After`` is honoured.
+- ``stream_generate`` reads ``streamGenerateContent`` (server-sent events) and
+  yields text as it arrives; it retries only until the first byte is received.
+- When GEMINI_RPM is set, every attempt takes a token from the process-wide
+  quota limiter (unset: no client-side throttling, 429s are backed off);
+  async calls are capped at GEMINI_MAX_IN_FLIGHT concurrent requests.
+
+``GEMINI_API_BASE`` overrides the endpoint (e.g. a local stub server in tests).
+"""
+
+import asyncio
+import email.utils
+import json
+import os
+import random
+import threading
+import time
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ml_pipeline.observability.metrics import span
+from ml_pipeline.text_structurer.rate_limiter import get_gemini_rate_limiter
+
+DEFAULT_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GeminiError(Exception):
+    """Raised when a Gemini call fails for good (non-retryable status or retries exhausted)."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def require_api_key(env_var: str) -> str:
+    """
+    API key from ``env_var``, read when a call is made rather than at import, so
+    modules load (and services boot) without Gemini credentials configured.
+    """
+    key = os.getenv(env_var)
+    if not key:
+        raise RuntimeError(f"{env_var} is not set")
+    return key
+
+
+def api_base() -> str:
+    return os.getenv("GEMINI_API_BASE", DEFAULT_API_BASE).rstrip("/")
+
+
+def default_timeout() -> tuple[float, float]:
+    """(connect, read) seconds from GEMINI_CONNECT_TIMEOUT / GEMINI_READ_TIMEOUT."""
+    return (
+        float(os.getenv("GEMINI_CONNECT_TIMEOUT", "10")),
+        float(os.getenv("GEMINI_READ_TIMEOUT", "120")),
+    )
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: float | None = None) -> float:
+    """Full-jitter exponential backoff for ``attempt`` (1-based), never shorter than Retry-After."""
+    delay = random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+def response_text(data: dict) -> str | None:
+    """Text of the first candidate's first part, or None."""
+    candidates = data.get("candidates") or []
+    if not candidates:
+        return None
+    parts = candidates[0].get("content", {}).get("parts") or []
+    if parts and "text" in parts[0]:
+        return parts[0]["text"]
+    return None
+
+
+def finish_reason(data: dict) -> str:
+    candidates = data.get("candidates") or [{}]
+    return candidates[0].get("finishReason", "UNKNOWN")
+
+
+def usage_tokens(data: dict) -> int | None:
+    """Total tokens billed for a response (``usageMetadata.totalTokenCount``), if reported."""
+    return (data.get("usageMetadata") or {}).get("totalTokenCount")
+
+
+def throttle() -> None:
+    limiter = get_gemini_rate_limiter()
+    if limiter is not None:
+        limiter.acquire()
+
+
+async def throttle_async() -> None:
+    limiter = get_gemini_rate_limiter()
+    if limiter is not None:
+        await limiter.acquire_async()
+
+
+def sse_text(line: str) -> str | None:
+    """Text delta carried by one ``data: {...}`` line of a streamGenerateContent response."""
+    if not line or not line.startswith("data:"):
+        return None
+    try:
+        return response_text(json.loads(line[5:]))
+    except ValueError:
+        return None
+
+
+# ---------------------------------------------------------------------
+# Shared pooled session (sync)
+# ---------------------------------------------------------------------
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process-wide keep-alive session; pool size from GEMINI_POOL_SIZE."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool_size = int(os.getenv("GEMINI_POOL_SIZE", "10"))
+            session = requests.Session()
+            # Retries are handled by GeminiClient so backoff and Retry-After stay in one place.
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class GeminiClient:
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-2.5-flash",
+        retries: int = 5,
+        backoff_base: float = 2.0,
+        backoff_cap: float = 60.0,
+        timeout: tuple[float, float] | None = None,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout or default_timeout()
+
+    @property
+    def url(self) -> str:
+        return f"{api_base()}/models/{self.model}:generateContent"
+
+    @property
+    def stream_url(self) -> str:
+        return f"{api_base()}/models/{self.model}:streamGenerateContent?alt=sse"
+
+    def _headers(self) -> dict:
+        return {"Content-Type": "application/json", "x-goog-api-key": self.api_key}
+
+    @staticmethod
+    def _payload(prompt: str, generation_config: dict) -> dict:
+        return {"contents": [{"parts": [{"text": prompt}]}], "generationConfig": generation_config}
+
+    def generate(self, prompt: str, generation_config: dict, timeout: tuple[float, float] | None = None) -> dict:
+        """POST generateContent with retries; returns the decoded JSON response."""
+        with span("gemini.http", bytes=len(prompt)) as stage:
+            data = self._generate(prompt, generation_config, timeout, stage)
+            stage.set(tokens=usage_tokens(data))
+            return data
+
+    def _generate(self, prompt: str, generation_config: dict, timeout, stage) -> dict:
+        payload = self._payload(prompt, generation_config)
+        last_error = None
+        for attempt in range(1, self.retries + 1):
+            stage.set(retries=attempt - 1)
+            retry_after = None
+            throttle()
+            try:
+                start_time = time.time()
+                response = get_session().post(
+                    self.url, headers=self._headers(), json=payload, timeout=timeout or self.timeout
+                )
+                latency = time.time() - start_time
+                # Avoid unicode symbols in logs (Windows consoles may use cp1252)
+                print(f"[INFO] Request attempt {attempt} -> HTTP {response.status_code} | {latency:.2f}s")
+
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in RETRY_STATUSES:
+                    raise GeminiError(f"API call failed: {response.text}", response.status_code)
+                last_error = GeminiError(f"HTTP {response.status_code}: {response.text[:200]}", response.status_code)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except requests.exceptions.RequestException as e:
+                print(f"[ERROR] Request error on attempt {attempt}: {e}")
+                last_error = GeminiError(str(e))
+
+            if attempt < self.retries:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap, retry_after)
+                print(f"[WARN] Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+        raise GeminiError(f"All {self.retries} retry attempts failed: {last_error}",
+                          getattr(last_error, "status_code", None))
+
+    def stream_generate(self, prompt: str, generation_config: dict, timeout: tuple[float, float] | None = None):
+        """
+        Yield text deltas from streamGenerateContent. Connection errors and retryable
+        statuses are retried like ``generate`` until the stream opens; a failure
+        after that raises ``GeminiError`` (the partial answer can't be resumed).
+        """
+        payload = self._payload(prompt, generation_config)
+        last_error = None
+        for attempt in range(1, self.retries + 1):
+            retry_after = None
+            throttle()
+            try:
+                response = get_session().post(
+                    self.stream_url, headers=self._headers(), json=payload,
+                    timeout=timeout or self.timeout, stream=True,
+                )
+            except requests.exceptions.RequestException as e:
+                print(f"[ERROR] Request error on attempt {attempt}: {e}")
+                last_error = GeminiError(str(e))
+            else:
+                print(f"[INFO] Stream attempt {attempt} -> HTTP {response.status_code}")
+                if response.status_code == 200:
+                    with response:
+                        try:
+                            # Bytes, decoded here: SSE is UTF-8, but requests falls back to
+                            # ISO-8859-1 for text/* without a charset (and to bytes with no
+                            # Content-Type), which would garble or break non-ASCII deltas.
+                            for raw_line in response.iter_lines():
+                                text = sse_text(raw_line.decode("utf-8", "replace"))
+                                if text:
+                                    yield text
+                        except requests.exceptions.RequestException as e:
+                            raise GeminiError(f"Stream interrupted: {e}") from e
+                    return
+                with response:
+                    if response.status_code not in RETRY_STATUSES:
+                        raise GeminiError(f"API call failed: {response.text}", response.status_code)
+                    last_error = GeminiError(f"HTTP {response.status_code}: {response.text[:200]}", response.status_code)
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+            if attempt < self.retries:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap, retry_after)
+                print(f"[WARN] Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+        raise GeminiError(f"All {self.retries} retry attempts failed: {last_error}",
+                          getattr(last_error, "status_code", None))
+
+
+class AsyncGeminiClient(GeminiClient):
+    """``GeminiClient`` on ``httpx.AsyncClient``; backoff uses ``asyncio.sleep``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx  # only needed by async callers
+
+            pool_size = int(os.getenv("GEMINI_POOL_SIZE", "10"))
+            connect, read = self.timeout
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+        return self._client
+
+    async def generate(self, prompt: str, generation_config: dict, timeout: tuple[float, float] | None = None) -> dict:
+        with span("gemini.http", bytes=len(prompt)) as stage:
+            data = await self._generate(prompt, generation_config, timeout, stage)
+            stage.set(tokens=usage_tokens(data))
+            return data
+
+    async def _generate(self, prompt: str, generation_config: dict, timeout, stage) -> dict:
+        import httpx
+
+        payload = self._payload(prompt, generation_config)
+        request_timeout = None
+        if timeout is not None:
+            request_timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        last_error = None
+        for attempt in range(1, self.retries + 1):
+            stage.set(retries=attempt - 1)
+            retry_after = None
+            await throttle_async()
+            try:
+                kwargs = {"timeout": request_timeout} if request_timeout is not None else {}
+                # Backoff sleeps happen outside the semaphore so they don't hold a slot.
+                async with _in_flight_semaphore():
+                    start_time = time.time()
+                    response = await self._get_client().post(
+                        self.url, headers=self._headers(), json=payload, **kwargs
+                    )
+                latency = time.time() - start_time
+                print(f"[INFO] Request attempt {attempt} -> HTTP {response.status_code} | {latency:.2f}s")
+
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in RETRY_STATUSES:
+                    raise GeminiError(f"API call failed: {response.text}", response.status_code)
+                last_error = GeminiError(f"HTTP {response.status_code}: {response.text[:200]}", response.status_code)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except httpx.HTTPError as e:
+                print(f"[ERROR] Request error on attempt {attempt}: {e}")
+                last_error = GeminiError(str(e))
+
+            if attempt < self.retries:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap, retry_after)
+                print(f"[WARN] Retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+
+        raise GeminiError(f"All {self.retries} retry attempts failed: {last_error}",
+                          getattr(last_error, "status_code", None))
+
+    async def stream_generate(self, prompt: str, generation_config: dict, timeout: tuple[float, float] | None = None):
+        """Async generator version of ``GeminiClient.stream_generate``."""
+        import httpx
+
+        payload = self._payload(prompt, generation_config)
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout[1], connect=timeout[0])
+        last_error = None
+        for attempt in range(1, self.retries + 1):
+            retry_after = None
+            await throttle_async()
+            try:
+                async with _in_flight_semaphore():
+                    async with self._get_client().stream(
+                        "POST", self.stream_url, headers=self._headers(), json=payload, **kwargs
+                    ) as response:
+                        print(f"[INFO] Stream attempt {attempt} -> HTTP {response.status_code}")
+                        if response.status_code == 200:
+                            try:
+                                async for line in response.aiter_lines():
+                                    text = sse_text(line)
+                                    if text:
+                                        yield text
+                            except httpx.HTTPError as e:
+                                raise GeminiError(f"Stream interrupted: {e}") from e
+                            return
+                        body = (await response.aread()).decode("utf-8", "replace")
+                        if response.status_code not in RETRY_STATUSES:
+                            raise GeminiError(f"API call failed: {body}", response.status_code)
+                        last_error = GeminiError(f"HTTP {response.status_code}: {body[:200]}", response.status_code)
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except httpx.HTTPError as e:
+                print(f"[ERROR] Request error on attempt {attempt}: {e}")
+                last_error = GeminiError(str(e))
+
+            if attempt < self.retries:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap, retry_after)
+                print(f"[WARN] Retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+
+        raise GeminiError(f"All {self.retries} retry attempts failed: {last_error}",
+                          getattr(last_error, "status_code", None))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# ---------------------------------------------------------------------
+# Per-event-loop async state
+# ---------------------------------------------------------------------
+# httpx clients and asyncio semaphores belong to the loop they were first used
+# on, so they are cached per running loop (and dropped with it).
+_async_clients = weakref.WeakKeyDictionary()
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _in_flight_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(int(os.getenv("GEMINI_MAX_IN_FLIGHT", "4")))
+    return semaphore
+
+
+def get_async_client(api_key: str, model: str) -> AsyncGeminiClient:
+    """Shared ``AsyncGeminiClient`` for the running event loop."""
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get((api_key, model))
+    if client is None:
+        client = clients[(api_key, model)] = AsyncGeminiClient(api_key, model)
+    return client
@@ -0,0 +1,133 @@
+# text_structurer/json_stream.py
+"""
+Incremental parser for a JSON object that arrives in pieces (streamed LLM output).
+
+``feed(chunk)`` returns the events completed by that chunk:
+
+- ``{"type": "section", "key": k, "value": v}`` when a top-level field is complete;
+- ``{"type": "item", "key": k, "index": i, "value": v}`` for each finished element
+  of the list fields in ``item_keys`` (e.g. every ``progress_notes`` entry), before
+  the whole list is done.
+
+Text before the first ``{`` (a Markdown fence, "Here is the JSON:") is skipped.
+Values that fail to decode are not emitted; the caller still parses the complete
+text at the end, which stays the source of truth.
+"""
+
+import json
+
+DEFAULT_ITEM_KEYS = ("progress_notes", "lab_reports")
+
+
+class IncrementalJSONParser:
+    def __init__(self, item_keys=DEFAULT_ITEM_KEYS):
+        self.item_keys = set(item_keys)
+        self._text = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._started = False
+        self.done = False
+        # Top-level field being read
+        self._key = None
+        self._value_start = None
+        # Element being read inside an item list
+        self._item_start = None
+        self._item_index = 0
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def _in_item_list(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "[" and self._key in self.item_keys
+
+    def _decode(self, start: int, end: int):
+        try:
+            return True, json.loads(self._text[start:end])
+        except ValueError:
+            return False, None
+
+    def _emit_section(self, end: int, events: list):
+        ok, value = self._decode(self._value_start, end)
+        if ok:
+            events.append({"type": "section", "key": self._key, "value": value})
+        self._key = None
+        self._value_start = None
+
+    def _emit_item(self, end: int, events: list):
+        ok, value = self._decode(self._item_start, end)
+        if ok:
+            events.append({"type": "item", "key": self._key, "index": self._item_index, "value": value})
+        self._item_index += 1
+        self._item_start = None
+
+    def _mark_value_start(self, i: int):
+        depth = len(self._stack)
+        if depth == 1 and self._key is not None and self._value_start is None:
+            self._value_start = i
+            self._item_index = 0
+        elif self._in_item_list() and self._item_start is None:
+            self._item_start = i
+
+    def feed(self, chunk: str) -> list:
+        events = []
+        if self.done or not chunk:
+            return events
+        self._text += chunk
+        text = self._text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._key is None:
+                        ok, key = self._decode(self._string_start, i + 1)
+                        self._key = key if ok else ""
+                continue
+            if not self._started:
+                if c == "{":
+                    self._started = True
+                    self._stack.append("{")
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                if not (len(self._stack) == 1 and self._key is None):
+                    self._mark_value_start(i)
+            elif c in "{[":
+                self._mark_value_start(i)
+                self._stack.append(c)
+            elif c in "}]":
+                depth = len(self._stack)
+                # Scalars are only terminated by the next delimiter.
+                if depth == 1 and self._value_start is not None:
+                    self._emit_section(i, events)
+                elif self._in_item_list() and c == "]" and self._item_start is not None:
+                    self._emit_item(i, events)
+                self._stack.pop()
+                depth -= 1
+                if self._in_item_list() and self._item_start is not None:
+                    self._emit_item(i + 1, events)
+                elif depth == 1 and self._value_start is not None:
+                    self._emit_section(i + 1, events)
+                elif depth == 0:
+                    self.done = True
+                    self._pos = i + 1
+                    return events
+            elif c == ",":
+                if len(self._stack) == 1 and self._value_start is not None:
+                    self._emit_section(i, events)
+                elif self._in_item_list() and self._item_start is not None:
+                    self._emit_item(i, events)
+            elif not c.isspace() and c != ":":
+                self._mark_value_start(i)
+        self._pos = len(text)
+        return events
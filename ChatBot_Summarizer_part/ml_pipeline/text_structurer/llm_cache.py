@@ -0,0 +1,168 @@
+# text_structurer/llm_cache.py
+"""
+Persistent cache of Gemini responses for the structurer and summarizer.
+
+Entries are keyed by a SHA-256 of the model name, the generation config and the
+exact prompt produced by ``prompt_builder``, so any prompt or config change is
+a miss rather than a stale hit. Storage is a single SQLite file (WAL mode, safe
+to share between threads and worker processes).
+
+- ``LLM_CACHE_PATH``         SQLite file; unset = caching off
+- ``LLM_CACHE_TTL_SECONDS``  entry lifetime (default 7 days, 0 = never expire)
+- ``LLM_CACHE_MAX_MB``       size budget; least-recently-used entries are evicted
+- ``LLM_CACHE_BYPASS=1``     skip reads and writes (callers can also pass use_cache=False)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def cache_key(model: str, generation_config: dict, prompt: str) -> str:
+    canonical = json.dumps(
+        {"model": model, "config": generation_config, "prompt": prompt},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counts = {}  # kind -> [hits, misses]
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    # -----------------------------------------------------------------
+    # Lookup / store
+    # -----------------------------------------------------------------
+    def _count(self, kind: str, hit: bool) -> None:
+        counts = self._counts.setdefault(kind, [0, 0])
+        counts[0 if hit else 1] += 1
+
+    def get(self, key: str, kind: str = "default") -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is not None:
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            self._count(kind, row is not None)
+        return row[0] if row is not None else None
+
+    def put(self, key: str, value: str, kind: str = "default", model: str = "") -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, model, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, model, value, size, now, now),
+            )
+            self._conn.commit()
+        self.evict()
+
+    # -----------------------------------------------------------------
+    # Eviction / stats
+    # -----------------------------------------------------------------
+    def evict(self) -> int:
+        """Drop expired entries, then least-recently-used ones until under ``max_bytes``. Returns rows removed."""
+        removed = 0
+        with self._lock:
+            if self.ttl_seconds:
+                cur = self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+                removed += cur.rowcount
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                victims = []
+                for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                    if total <= self.max_bytes:
+                        break
+                    victims.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+                removed += len(victims)
+            self._conn.commit()
+        if removed:
+            print(f"[CACHE] Evicted {removed} LLM cache entr{'y' if removed == 1 else 'ies'}.")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            kinds = {}
+            for kind, (hits, misses) in sorted(self._counts.items()):
+                lookups = hits + misses
+                kinds[kind] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                }
+        hits = sum(k["hits"] for k in kinds.values())
+        lookups = hits + sum(k["misses"] for k in kinds.values())
+        return {
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "by_kind": kinds,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache(use_cache: bool = True) -> LLMCache | None:
+    """
+    Process-wide response cache, or None when caching is off (``LLM_CACHE_PATH``
+    unset), bypassed (``LLM_CACHE_BYPASS``) or ``use_cache`` is False.
+    """
+    global _default_cache
+    path = os.getenv("LLM_CACHE_PATH")
+    if not use_cache or not path or os.getenv("LLM_CACHE_BYPASS", "0") == "1":
+        return None
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache.path != path:
+            ttl = float(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+            max_mb = float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024)))
+            _default_cache = LLMCache(path, ttl_seconds=ttl, max_bytes=int(max_mb * 1024 * 1024))
+        return _default_cache
+
+
+def llm_cache_stats() -> dict | None:
+    """Stats of the process-wide cache, or None if it was never opened."""
+    return _default_cache.stats() if _default_cache is not None else None
@@ -2,95 +2,85 @@
 import os
 import json
 import time
-import requests
-from ml_pipeline.text_structurer.prompt_builder import build_medical_prompt
-from ml_pipeline.text_structurer.utils_json import validate_and_parse_json, clean_unicode
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from ml_pipeline.text_structurer.gemini_client import (
+    GeminiClient,
+    GeminiError,
+    get_async_client,
+    require_api_key,
+    response_text,
+)
+from ml_pipeline.text_structurer.chunking import merge_structured, split_into_chunks
+from ml_pipeline.text_structurer.config import STRUCTURER_MODEL
+from ml_pipeline.text_structurer.json_stream import DEFAULT_ITEM_KEYS, IncrementalJSONParser
+from ml_pipeline.text_structurer.llm_cache import cache_key, get_llm_cache
+from ml_pipeline.text_structurer.prompt_builder import (
+    SCHEMA_SECTIONS,
+    build_medical_prompt,
+    detect_sections,
+    estimate_tokens,
+)
+from ml_pipeline.text_structurer.utils_json import validate_and_parse_json
+from ml_pipeline.observability.metrics import record_stage, span
 
 # ---------------------------------------------------------------------
 # Configure Gemini API
 # ---------------------------------------------------------------------
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY_STRUCTURER")
+# Checked at call time (require_api_key), not import.
+API_KEY_ENV = "GEMINI_API_KEY_STRUCTURER"
+MODEL_NAME = STRUCTURER_MODEL
 
-if not GEMINI_API_KEY:
-    raise RuntimeError("GEMINI_API_KEY is not set")
-MODEL_NAME = "gemini-2.5-flash" 
+GENERATION_CONFIG = {
+    "temperature": 0,
+    "topP": 1,
+    "topK": 1,
+    "maxOutputTokens": 20480
+}
 
-API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{MODEL_NAME}:generateContent"
+# Long documents are structured in chunks of at most this many characters.
+# STRUCTURER_CHUNKING: auto (only above the chunk size) / always / never.
+CHUNK_CHARS = int(os.getenv("STRUCTURER_CHUNK_CHARS", "16000"))
+CHUNK_WORKERS = int(os.getenv("STRUCTURER_CHUNK_WORKERS", "4"))
 
 # ---------------------------------------------------------------------
 # LLM API call with retry handling
 # ---------------------------------------------------------------------
 def call_llm_api(prompt, retries=5, delay=5):
     """
-    Calls Gemini API directly using REST request with retry on rate-limit (429) or transient errors.
+    Calls Gemini generateContent through the shared pooled client, retrying on
+    rate-limit (429) or transient errors with jittered backoff.
     """
-    headers = {
-        "Content-Type": "application/json",
-        "x-goog-api-key": GEMINI_API_KEY
-    }
-
-    payload = {
-        "contents": [{"parts": [{"text": prompt}]}],
-        "generationConfig": {
-            "temperature": 0,
-            "topP": 1,
-            "topK": 1,
-            "maxOutputTokens": 20480
-        }
-    }
-
-    for attempt in range(1, retries + 1):
-        try:
-            start_time = time.time()
-            response = requests.post(API_URL, headers=headers, json=payload, timeout=120)
-            latency = time.time() - start_time
-            # Avoid unicode symbols in logs (Windows consoles may use cp1252)
-            print(f"[INFO] Request attempt {attempt} -> HTTP {response.status_code} | {latency:.2f}s")
-
-            if response.status_code == 200:
-                data = response.json()
-                if "candidates" in data and len(data["candidates"]) > 0:
-                    content = data["candidates"][0].get("content", {})
-                    parts = content.get("parts", [])
-                    if parts and "text" in parts[0]:
-                        return parts[0]["text"]
-                print("[ERROR] No text content returned in API response.")
-                return None
-
-            elif response.status_code == 429:
-                # Too many requests -> exponential backoff
-                print(f"[WARN] Rate limit hit (429). Retrying in {delay}s...")
-                time.sleep(delay)
-                delay *= 2  # Exponential backoff
-                continue
-
-            else:
-                print(f"[ERROR] API call failed: {response.text}")
-                return None
-
-        except requests.exceptions.RequestException as e:
-            print(f"[ERROR] Request error on attempt {attempt}: {e}")
-            time.sleep(delay)
-            delay *= 2
-
-    print("[ERROR] All retry attempts failed.")
-    return None
+    client = GeminiClient(require_api_key(API_KEY_ENV), MODEL_NAME, retries=retries, backoff_base=delay)
+    try:
+        data = client.generate(prompt, GENERATION_CONFIG)
+    except GeminiError as e:
+        print(f"[ERROR] {e}")
+        return None
+
+    text = response_text(data)
+    if text is None:
+        print("[ERROR] No text content returned in API response.")
+    return text
+
+
+async def acall_llm_api(prompt):
+    """Async ``call_llm_api``: backoff and rate limiting never block the event loop."""
+    try:
+        data = await get_async_client(require_api_key(API_KEY_ENV), MODEL_NAME).generate(prompt, GENERATION_CONFIG)
+    except GeminiError as e:
+        print(f"[ERROR] {e}")
+        return None
+
+    text = response_text(data)
+    if text is None:
+        print("[ERROR] No text content returned in API response.")
+    return text
 
 # ---------------------------------------------------------------------
 # Structurer Function
 # ---------------------------------------------------------------------
-def call_gemini_structurer(extracted_text):
-    """
-    Converts extracted medical text into structured JSON via Gemini 2.5 API.
-    """
-    prompt = build_medical_prompt(clean_unicode(extracted_text))
-    print(f"[INFO] Calling {MODEL_NAME} via direct REST API for structured extraction...")
-    start_time = time.time()
-
-    response_text = call_llm_api(prompt)
-    latency = time.time() - start_time
-    print(f"[TIMER] Total LLM call duration: {latency:.2f} seconds")
-
+def _parse_structurer_response(response_text):
     if not response_text:
         print("[ERROR] Empty or failed response from API.")
         return None
@@ -106,6 +96,220 @@ def call_gemini_structurer(extracted_text):
         print("[ERROR] JSON validation failed.")
         return None
 
+
+def _cached_structure(prompt, use_cache):
+    """Returns ``(cache, key, parsed)``; ``parsed`` is set on a usable cache hit."""
+    cache = get_llm_cache(use_cache)
+    if cache is None:
+        return None, None, None
+    key = cache_key(MODEL_NAME, GENERATION_CONFIG, prompt)
+    cached = cache.get(key, kind="structurer")
+    if cached is None:
+        return cache, key, None
+    print("[CACHE] Structurer response served from LLM cache.")
+    return cache, key, validate_and_parse_json(cached)
+
+
+def _structure_prompt(prompt, use_cache):
+    cache, key, parsed = _cached_structure(prompt, use_cache)
+    if parsed:
+        return parsed
+
+    print(f"[INFO] Calling {MODEL_NAME} via direct REST API for structured extraction...")
+    with span("structure.llm", log=True, model=MODEL_NAME, bytes=len(prompt)):
+        response_text = call_llm_api(prompt)
+
+    parsed = _parse_structurer_response(response_text)
+    # Only responses that parsed are cached, so a retry can recover from a bad answer.
+    if parsed and cache is not None:
+        cache.put(key, response_text, kind="structurer", model=MODEL_NAME)
+    return parsed
+
+
+async def _astructure_prompt(prompt, use_cache):
+    cache, key, parsed = _cached_structure(prompt, use_cache)
+    if parsed:
+        return parsed
+
+    print(f"[INFO] Calling {MODEL_NAME} (async) for structured extraction...")
+    with span("structure.llm", log=True, model=MODEL_NAME, bytes=len(prompt)):
+        response_text = await acall_llm_api(prompt)
+
+    parsed = _parse_structurer_response(response_text)
+    if parsed and cache is not None:
+        cache.put(key, response_text, kind="structurer", model=MODEL_NAME)
+    return parsed
+
+
+def _build_prompts(extracted_text, chunked):
+    """
+    One prompt for short documents, one per chunk (in document order) for long ones.
+    The text is used as extracted: ``pages_to_text`` already normalized it.
+    """
+    with span("prompt.build", kind="structurer") as stage:
+        prompts = _prompts_for(extracted_text.strip(), chunked)
+        stage.set(
+            chunks=len(prompts),
+            bytes=sum(len(prompt) for prompt in prompts),
+            tokens=sum(estimate_tokens(prompt) for prompt in prompts),
+        )
+    return prompts
+
+
+def _prompts_for(text, chunked):
+    mode = os.getenv("STRUCTURER_CHUNKING", "auto") if chunked is None else ("always" if chunked else "never")
+    if mode == "never" or (mode == "auto" and len(text) <= CHUNK_CHARS):
+        sections = detect_sections(text)
+        if len(sections) < len(SCHEMA_SECTIONS):
+            print(f"[INFO] Structuring schema limited to detected sections: {', '.join(sections)}")
+        return [build_medical_prompt(text, sections=sections)]
+    chunks = split_into_chunks(text, CHUNK_CHARS)
+    if len(chunks) == 1:
+        return [build_medical_prompt(chunks[0])]
+    print(f"[INFO] Document split into {len(chunks)} chunks for structuring ({len(text)} chars).")
+    return [build_medical_prompt(chunk, part=(i + 1, len(chunks))) for i, chunk in enumerate(chunks)]
+
+
+def _merge_chunk_results(parts):
+    failed = [i + 1 for i, part in enumerate(parts) if not part]
+    if failed:
+        # A partial record would silently drop clinical data; successful chunks are
+        # cached, so a retry only re-runs the failed ones.
+        print(f"[ERROR] Structuring failed for chunk(s) {failed} of {len(parts)}.")
+        return None
+    merged = merge_structured(parts)
+    print(f"[INFO] Merged {len(parts)} structured chunks.")
+    return merged
+
+
+def _structure_prompts(prompts, use_cache):
+    if len(prompts) == 1:
+        return _structure_prompt(prompts[0], use_cache)
+
+    with span("structure.chunked", log=True, chunks=len(prompts)):
+        with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(prompts))) as pool:
+            parts = list(pool.map(lambda prompt: _structure_prompt(prompt, use_cache), prompts))
+    return _merge_chunk_results(parts)
+
+
+async def _astructure_prompts(prompts, use_cache):
+    if len(prompts) == 1:
+        return await _astructure_prompt(prompts[0], use_cache)
+
+    with span("structure.chunked", log=True, chunks=len(prompts)):
+        parts = await asyncio.gather(*(_astructure_prompt(prompt, use_cache) for prompt in prompts))
+    return _merge_chunk_results(list(parts))
+
+
+def call_gemini_structurer(extracted_text, use_cache=True, chunked=None):
+    """
+    Converts extracted medical text into structured JSON via Gemini 2.5 API.
+    Responses are cached by prompt (see ``llm_cache``); ``use_cache=False`` bypasses it.
+    Long documents are split into chunks that are structured concurrently and
+    merged (see ``chunking``); ``chunked`` forces the mode on or off.
+    """
+    return _structure_prompts(_build_prompts(extracted_text, chunked), use_cache)
+
+
+async def acall_gemini_structurer(extracted_text, use_cache=True, chunked=None):
+    """
+    Async ``call_gemini_structurer`` for FastAPI handlers and other asyncio callers.
+    Chunks run concurrently, bounded by the client's in-flight limit.
+    """
+    return await _astructure_prompts(_build_prompts(extracted_text, chunked), use_cache)
+
+
+# ---------------------------------------------------------------------
+# Streaming structurer
+# ---------------------------------------------------------------------
+def _replay_events(parsed, emit):
+    """Emit the events a streamed parse would have produced, for cached / merged results."""
+    for key, value in parsed.items():
+        if key in DEFAULT_ITEM_KEYS and isinstance(value, list):
+            for index, item in enumerate(value):
+                emit({"type": "item", "key": key, "index": index, "value": item})
+        emit({"type": "section", "key": key, "value": value})
+
+
+def _first_chunk(parser, start_time):
+    if not parser.text:
+        record_stage("structure.stream.first_chunk", time.perf_counter() - start_time)
+
+
+def _finish_stream(parser, cache, key):
+    response_text = parser.text
+    parsed = _parse_structurer_response(response_text)
+    if parsed and cache is not None:
+        cache.put(key, response_text, kind="structurer", model=MODEL_NAME)
+    return parsed
+
+
+def stream_gemini_structurer(extracted_text, on_event=None, use_cache=True):
+    """
+    Like ``call_gemini_structurer``, but streams the response and calls
+    ``on_event(event)`` (see ``json_stream``) as each top-level section and each
+    ``progress_notes`` / ``lab_reports`` item completes. Returns the full parsed
+    JSON. Cache hits and chunked documents replay the events from the final result.
+    """
+    emit = on_event or (lambda event: None)
+    prompts = _build_prompts(extracted_text, None)
+    if len(prompts) > 1:
+        parsed = _structure_prompts(prompts, use_cache)
+        if parsed:
+            _replay_events(parsed, emit)
+        return parsed
+
+    cache, key, parsed = _cached_structure(prompts[0], use_cache)
+    if parsed:
+        _replay_events(parsed, emit)
+        return parsed
+
+    print(f"[INFO] Streaming {MODEL_NAME} structured extraction...")
+    parser = IncrementalJSONParser()
+    client = GeminiClient(require_api_key(API_KEY_ENV), MODEL_NAME)
+    try:
+        with span("structure.stream", log=True, model=MODEL_NAME, bytes=len(prompts[0])):
+            start_time = time.perf_counter()
+            for delta in client.stream_generate(prompts[0], GENERATION_CONFIG):
+                _first_chunk(parser, start_time)
+                for event in parser.feed(delta):
+                    emit(event)
+    except GeminiError as e:
+        print(f"[ERROR] {e}")
+        return None
+    return _finish_stream(parser, cache, key)
+
+
+async def astream_gemini_structurer(extracted_text, on_event=None, use_cache=True):
+    """Async ``stream_gemini_structurer``; ``on_event`` is a plain (sync) callback."""
+    emit = on_event or (lambda event: None)
+    prompts = _build_prompts(extracted_text, None)
+    if len(prompts) > 1:
+        parsed = await _astructure_prompts(prompts, use_cache)
+        if parsed:
+            _replay_events(parsed, emit)
+        return parsed
+
+    cache, key, parsed = _cached_structure(prompts[0], use_cache)
+    if parsed:
+        _replay_events(parsed, emit)
+        return parsed
+
+    print(f"[INFO] Streaming {MODEL_NAME} structured extraction (async)...")
+    parser = IncrementalJSONParser()
+    client = get_async_client(require_api_key(API_KEY_ENV), MODEL_NAME)
+    try:
+        with span("structure.stream", log=True, model=MODEL_NAME, bytes=len(prompts[0])):
+            start_time = time.perf_counter()
+            async for delta in client.stream_generate(prompts[0], GENERATION_CONFIG):
+                _first_chunk(parser, start_time)
+                for event in parser.feed(delta):
+                    emit(event)
+    except GeminiError as e:
+        print(f"[ERROR] {e}")
+        return None
+    return _finish_stream(parser, cache, key)
+
 # ---------------------------------------------------------------------
 # Standalone testing entrypoint
 # ---------------------------------------------------------------------
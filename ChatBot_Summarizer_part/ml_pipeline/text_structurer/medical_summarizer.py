@@ -1,86 +1,175 @@
 # text_structurer/medical_summarizer.py
 import os
 import json
-import time
-import requests
-from ml_pipeline.text_structurer.utils_json import clean_unicode
-from ml_pipeline.text_structurer.prompt_builder import build_summary_prompt
+from ml_pipeline.text_structurer.gemini_client import (
+    GeminiClient,
+    GeminiError,
+    finish_reason,
+    get_async_client,
+    require_api_key,
+    response_text,
+)
+from ml_pipeline.text_structurer.config import SUMMARIZER_MODEL
+from ml_pipeline.text_structurer.llm_cache import cache_key, get_llm_cache
+from ml_pipeline.text_structurer.prompt_builder import (
+    build_summary_prompt,
+    estimate_tokens,
+    prompt_payload_savings,
+    serialize_for_prompt,
+)
+from ml_pipeline.observability.metrics import span
 
 # Gemini API configuration
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY_SUMMARIZER")
+# Checked at call time (require_api_key), not import.
+API_KEY_ENV = "GEMINI_API_KEY_SUMMARIZER"
+MODEL_NAME = SUMMARIZER_MODEL
+
+GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "maxOutputTokens": 4000
+}
+# Used once when the first answer is cut off (finishReason MAX_TOKENS).
+RETRY_GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "maxOutputTokens": 8000
+}
+
+
+def _first_summary(data: dict):
+    """
+    Returns ``(summary, retry)``: the summary text if present, and whether the
+    answer was cut off (MAX_TOKENS) and is worth one retry with a larger budget.
+    """
+    if not data.get("candidates"):
+        print("[ERROR] No candidates returned by Gemini.")
+        return None, False
+
+    summary = response_text(data)
+    if summary is not None:
+        return summary.strip(), False
+
+    reason = finish_reason(data)
+    print(f"[WARN] No 'parts' field found. Finish reason: {reason}")
+    return None, reason == "MAX_TOKENS"
+
 
-if not GEMINI_API_KEY:
-    raise RuntimeError("GEMINI_API_KEY is not set")
-MODEL_NAME = "gemini-2.5-flash" 
+def _retry_summary(retry_data: dict):
+    summary = response_text(retry_data)
+    if summary is not None:
+        return summary.strip()
+    print("[ERROR] Summary not found after retry.")
+    return None
 
-def call_gemini_summarizer(structured_data: str):
+
+def _summary_prompt(structured_data) -> str:
+    """
+    Prompt for a structured record: dicts are serialized compactly (nulls and empty
+    lists pruned, see ``serialize_for_prompt``); strings are used as given.
+    """
+    with span("prompt.build", kind="summarizer") as stage:
+        prompt = _summary_prompt_for(structured_data)
+        stage.set(bytes=len(prompt), tokens=estimate_tokens(prompt))
+    return prompt
+
+
+def _prompt_metrics_enabled() -> bool:
+    """SUMMARY_PROMPT_METRICS=1 logs the payload size against an indent=2 dump (off: it re-serializes)."""
+    return os.getenv("SUMMARY_PROMPT_METRICS", "0").lower() in ("1", "true", "yes")
+
+
+def _summary_prompt_for(structured_data) -> str:
+    # Text is normalized once per document (pages_to_text); no second Unicode pass here.
+    if isinstance(structured_data, str):
+        return build_summary_prompt(structured_data)
+    compact = serialize_for_prompt(structured_data)
+    if _prompt_metrics_enabled():
+        savings = prompt_payload_savings(structured_data, compact)
+        print(
+            f"[METRICS] Summary prompt payload {savings['pretty_bytes']} -> {savings['compact_bytes']} bytes "
+            f"(-{savings['saved_pct']}%), ~{savings['pretty_tokens_est']} -> ~{savings['compact_tokens_est']} tokens"
+        )
+    return build_summary_prompt(compact)
+
+
+def _cached_summary(prompt: str, use_cache: bool):
+    """Returns ``(cache, key, summary)``; ``summary`` is set on a cache hit."""
+    cache = get_llm_cache(use_cache)
+    if cache is None:
+        return None, None, None
+    key = cache_key(MODEL_NAME, GENERATION_CONFIG, prompt)
+    summary = cache.get(key, kind="summarizer")
+    if summary is not None:
+        print("[CACHE] Summary served from LLM cache.")
+    return cache, key, summary
+
+
+def _store_summary(cache, key: str, summary):
+    if summary and cache is not None:
+        cache.put(key, summary, kind="summarizer", model=MODEL_NAME)
+    return summary
+
+
+def call_gemini_summarizer(structured_data: str | dict, use_cache: bool = True):
     """
     Calls Gemini 2.5 to summarize structured medical data.
     Handles missing 'parts' and retries if output is truncated (MAX_TOKENS).
+    Summaries are cached by prompt (see ``llm_cache``); ``use_cache=False`` bypasses it.
+    Pass the structured dict rather than a JSON dump so it is serialized compactly.
     """
-    prompt = build_summary_prompt(clean_unicode(structured_data))
-    url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
-    headers = {
-        "Content-Type": "application/json",
-        "x-goog-api-key": GEMINI_API_KEY
-    }
-
-    payload = {
-        "contents": [{"parts": [{"text": prompt}]}],
-        "generationConfig": {
-            "temperature": 0.2,
-            "maxOutputTokens": 4000
-        }
-    }
+    prompt = _summary_prompt(structured_data)
+    cache, key, summary = _cached_summary(prompt, use_cache)
+    if summary is not None:
+        return summary
+    client = GeminiClient(require_api_key(API_KEY_ENV), MODEL_NAME)
 
     print("[INFO] Calling Gemini for summary generation...")
-    start_time = time.time()
-    response = requests.post(url, headers=headers, json=payload)
-    latency = time.time() - start_time
-    print(f"[TIMER] Gemini call took {latency:.2f} seconds")
+    try:
+        with span("summarize.llm", log=True, model=MODEL_NAME, bytes=len(prompt)):
+            data = client.generate(prompt, GENERATION_CONFIG)
+
+        summary, retry = _first_summary(data)
+        if summary is not None or not retry:
+            return _store_summary(cache, key, summary)
 
-    if response.status_code != 200:
-        print(f"[ERROR] API failed: {response.text}")
+        # Retry if truncated due to MAX_TOKENS
+        print("[INFO] Retrying with higher token limit...")
+        return _store_summary(cache, key, _retry_summary(client.generate(prompt, RETRY_GENERATION_CONFIG)))
+
+    except GeminiError as e:
+        print(f"[ERROR] API failed: {e}")
         return None
+    except Exception as e:
+        print(f"[ERROR] Failed to parse summary: {e}")
+        return None
+
 
-    data = response.json()
+async def acall_gemini_summarizer(structured_data: str | dict, use_cache: bool = True):
+    """
+    Async ``call_gemini_summarizer``; same MAX_TOKENS retry and caching behaviour.
+    """
+    prompt = _summary_prompt(structured_data)
+    cache, key, summary = _cached_summary(prompt, use_cache)
+    if summary is not None:
+        return summary
+    client = get_async_client(require_api_key(API_KEY_ENV), MODEL_NAME)
 
+    print("[INFO] Calling Gemini (async) for summary generation...")
     try:
-        candidates = data.get("candidates", [])
-        if not candidates:
-            print("[ERROR] No candidates returned by Gemini.")
-            return None
-
-        candidate = candidates[0]
-        content = candidate.get("content", {})
-
-        # Safely check for 'parts'
-        if "parts" in content and len(content["parts"]) > 0 and "text" in content["parts"][0]:
-            summary = content["parts"][0]["text"].strip()
-            return summary
-        else:
-            finish_reason = candidate.get("finishReason", "UNKNOWN")
-            print(f"[WARN] No 'parts' field found. Finish reason: {finish_reason}")
-
-            # Retry if truncated due to MAX_TOKENS
-            if finish_reason == "MAX_TOKENS":
-                print("[INFO] Retrying with higher token limit...")
-                payload["generationConfig"]["maxOutputTokens"] = 8000
-                payload["generationConfig"]["temperature"] = 0.1
-                retry_resp = requests.post(url, headers=headers, json=payload)
-                retry_data = retry_resp.json()
-                retry_candidate = retry_data.get("candidates", [{}])[0]
-                retry_content = retry_candidate.get("content", {})
-                if "parts" in retry_content and len(retry_content["parts"]) > 0 and "text" in retry_content["parts"][0]:
-                    summary = retry_content["parts"][0]["text"].strip()
-                    return summary
-
-            print("[ERROR] Summary not found after retry.")
-            return None
+        with span("summarize.llm", log=True, model=MODEL_NAME, bytes=len(prompt)):
+            data = await client.generate(prompt, GENERATION_CONFIG)
+
+        summary, retry = _first_summary(data)
+        if summary is not None or not retry:
+            return _store_summary(cache, key, summary)
 
+        print("[INFO] Retrying with higher token limit...")
+        return _store_summary(cache, key, _retry_summary(await client.generate(prompt, RETRY_GENERATION_CONFIG)))
+
+    except GeminiError as e:
+        print(f"[ERROR] API failed: {e}")
+        return None
     except Exception as e:
         print(f"[ERROR] Failed to parse summary: {e}")
-        print(json.dumps(data, indent=2))
         return None
 
 
@@ -89,7 +178,7 @@ def summarize_structured_json(input_path: str):
     Reads structured JSON, summarizes it, and saves output as summary.txt.
     """
     with open(input_path, "r", encoding="utf-8") as f:
-        structured_json = json.dumps(json.load(f), indent=2)
+        structured_json = json.load(f)
 
     summary = call_gemini_summarizer(structured_json)
     if summary:
@@ -1,22 +1,16 @@
 # text_structurer/prompt_builder.py
+import hashlib
+import json
+import re
 
-def build_medical_prompt(extracted_text: str) -> str:
-    """
-    Flexible hierarchical prompt for structuring diverse healthcare documents
-    (e.g., admission notes, lab results, discharge summaries, progress notes).
-    """
-
-    return f"""
-You are an expert clinical NLP system that structures unstructured medical documents.
-The input text can contain sections such as admission, medical history, physical exam,
-progress notes, lab results, and discharge summary — not all sections will always exist.
+from ml_pipeline.text_structurer.config import schema_pruning_enabled, summary_prompt_format
 
-Your task: Parse the text into a hierarchical JSON capturing all relevant data.
-
-Return ONLY valid JSON with this general structure (omit missing sections):
-
-{{
-  "patient_information": {{
+# ---------------------------------------------------------------------
+# Structuring schema, one fragment per top-level section
+# ---------------------------------------------------------------------
+SCHEMA_FRAGMENTS = {
+    "patient_information": """\
+  "patient_information": {
       "patient_name": null,
       "patient_id": null,
       "dob": null,
@@ -29,22 +23,24 @@ Return ONLY valid JSON with this general structure (omit missing sections):
       "admission_id": null,
       "admission_date": null,
       "discharge_date": null
-  }},
-  "admission_summary": {{
+  }""",
+    "admission_summary": """\
+  "admission_summary": {
       "chief_complaint": null,
       "history_of_present_illness": null,
       "assessment": null,
       "differential_diagnosis": [],
       "primary_diagnosis": null,
       "secondary_diagnoses": [],
-      "plan": {{
+      "plan": {
           "diagnostic_plan": [],
           "therapeutic_plan": [],
           "follow_up_plan": [],
           "consultations": []
-      }}
-  }},
-  "medical_history": {{
+      }
+  }""",
+    "medical_history": """\
+  "medical_history": {
       "chronic_conditions": [],
       "past_illnesses": [],
       "surgeries": [],
@@ -52,26 +48,27 @@ Return ONLY valid JSON with this general structure (omit missing sections):
       "allergies": [],
       "medications": [],
       "family_history": [],
-      "social_history": {{
+      "social_history": {
           "occupation": null,
           "marital_status": null,
           "children": null,
           "smoking": null,
           "alcohol": null,
           "exercise": null
-      }},
+      },
       "preventive_care": []
-  }},
-  "physical_examination": {{
+  }""",
+    "physical_examination": """\
+  "physical_examination": {
       "general_appearance": null,
-      "vital_signs": {{
+      "vital_signs": {
           "blood_pressure": null,
           "heart_rate": null,
           "respiratory_rate": null,
           "temperature": null,
           "oxygen_saturation": null
-      }},
-      "system_examination": {{
+      },
+      "system_examination": {
           "heent": null,
           "cardiovascular": null,
           "respiratory": null,
@@ -79,34 +76,37 @@ Return ONLY valid JSON with this general structure (omit missing sections):
           "musculoskeletal": null,
           "neurological": null,
           "skin": null
-      }}
-  }},
+      }
+  }""",
+    "progress_notes": """\
   "progress_notes": [
-      {{
+      {
           "date": null,
           "time": null,
           "subjective": null,
           "objective": null,
           "assessment": null,
           "plan": null
-      }}
-  ],
+      }
+  ]""",
+    "lab_reports": """\
   "lab_reports": [
-      {{
+      {
           "report_date": null,
           "test_name": null,
           "parameters": [
-              {{
+              {
                   "name": null,
                   "value": null,
                   "unit": null,
                   "reference_range": null,
                   "flag": null
-              }}
+              }
           ]
-      }}
-  ],
-  "discharge_summary": {{
+      }
+  ]""",
+    "discharge_summary": """\
+  "discharge_summary": {
       "reason_for_admission": null,
       "hospital_course": null,
       "discharge_diagnoses": [],
@@ -114,8 +114,73 @@ Return ONLY valid JSON with this general structure (omit missing sections):
       "follow_up_plans": [],
       "discharge_instructions": [],
       "additional_notes": null
-  }}
-}}
+  }""",
+}
+SCHEMA_SECTIONS = tuple(SCHEMA_FRAGMENTS)
+
+# Header / keyword cues per section. Matches are cheap and deliberately loose: a
+# false positive only costs a few schema lines, a miss would hide a section.
+SECTION_CUES = {
+    "admission_summary": r"chief complaint|history of present illness|\bHPI\b|admission|admitted|"
+                         r"assessment|diagnos[ie]s|impression|\bplan\b",
+    "medical_history": r"medical history|\bPMH\b|surgical history|past history|allergies|allergic|"
+                       r"medications?|family history|social history|smok|alcohol",
+    "physical_examination": r"physical exam|examination|vital signs|vitals|blood pressure|\bBP\b|"
+                            r"heart rate|pulse|\bHEENT\b|general appearance|temperature",
+    "progress_notes": r"progress note|\bSOAP\b|subjective|objective|hospital day|daily note|interval history",
+    "lab_reports": r"\blab(?:oratory)?s?\b|test name|reference range|ref\.? range|specimen|\bCBC\b|"
+                   r"\bBMP\b|\bCMP\b|h(?:a)?emoglobin|glucose|creatinine|mg/dL|mmol/L|g/dL",
+    "discharge_summary": r"discharge",
+}
+_SECTION_CUE_RES = {key: re.compile(pattern, re.IGNORECASE) for key, pattern in SECTION_CUES.items()}
+
+
+def detect_sections(extracted_text: str) -> list[str]:
+    """
+    Schema sections worth asking for, in schema order. ``patient_information``
+    is always kept; with no cues at all (or STRUCTURER_SCHEMA_PRUNING=0) the full
+    schema is used.
+    """
+    if not schema_pruning_enabled():
+        return list(SCHEMA_SECTIONS)
+    found = {key for key, cue in _SECTION_CUE_RES.items() if cue.search(extracted_text)}
+    if not found:
+        return list(SCHEMA_SECTIONS)
+    return [key for key in SCHEMA_SECTIONS if key == "patient_information" or key in found]
+
+
+def build_medical_prompt(
+    extracted_text: str,
+    part: tuple[int, int] | None = None,
+    sections: list[str] | None = None,
+) -> str:
+    """
+    Flexible hierarchical prompt for structuring diverse healthcare documents
+    (e.g., admission notes, lab results, discharge summaries, progress notes).
+    ``part=(i, n)`` marks the input as chunk i of n of a longer document.
+    Only the schema fragments for ``sections`` are included; by default they are
+    detected from the text (see ``detect_sections``).
+    """
+    if sections is None:
+        sections = detect_sections(extracted_text)
+    schema = "{\n" + ",\n".join(SCHEMA_FRAGMENTS[key] for key in SCHEMA_SECTIONS if key in sections) + "\n}"
+    part_note = ""
+    if part is not None:
+        part_note = (
+            f"\nThis input is part {part[0]} of {part[1]} of a longer document. Structure only what\n"
+            "appears in this part; the other parts are processed separately and merged later.\n"
+        )
+
+    return f"""
+You are an expert clinical NLP system that structures unstructured medical documents.
+The input text can contain sections such as admission, medical history, physical exam,
+progress notes, lab results, and discharge summary — not all sections will always exist.
+
+Your task: Parse the text into a hierarchical JSON capturing all relevant data.
+{part_note}
+Return ONLY valid JSON with this general structure (omit missing sections):
+
+{schema}
 
 ### RULES:
 - Output must be **strictly valid JSON** (no commentary, no Markdown).
@@ -165,3 +230,85 @@ Guidelines:
 {structured_json}
 """
 
+
+# Identifies the templates stored results were produced with (see ``document_store``);
+# changes whenever a prompt or the schema does.
+PROMPT_VERSION = hashlib.sha256(
+    (build_medical_prompt("", sections=list(SCHEMA_SECTIONS)) + build_summary_prompt("")).encode("utf-8")
+).hexdigest()[:12]
+
+
+# ---------------------------------------------------------------------
+# Compact serialization of structured records for prompts
+# ---------------------------------------------------------------------
+# SUMMARY_PROMPT_FORMAT: json (minified, default) / kv (indented key: value lines)
+# / pretty (the old indent=2 dump, nothing pruned).
+def prune_empty(value):
+    """Drop None, empty strings, empty lists and empty dicts, recursively."""
+    if isinstance(value, dict):
+        pruned = {k: prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [prune_empty(v) for v in value]
+        return [v for v in pruned if v not in (None, "", [], {})]
+    return value
+
+
+def _kv_scalar(value) -> str:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _kv_lines(value, indent: int, out: list):
+    pad = "  " * indent
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                out.append(f"{pad}{key}:")
+                _kv_lines(item, indent + 1, out)
+            else:
+                out.append(f"{pad}{key}: {_kv_scalar(item)}")
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, (dict, list)):
+                start = len(out)
+                _kv_lines(item, indent + 1, out)
+                if len(out) > start:
+                    out[start] = f"{pad}- " + out[start].lstrip()
+            else:
+                out.append(f"{pad}- {_kv_scalar(item)}")
+    else:
+        out.append(f"{pad}{_kv_scalar(value)}")
+
+
+def serialize_for_prompt(structured, mode: str | None = None) -> str:
+    """Render a structured record for an LLM prompt; see SUMMARY_PROMPT_FORMAT."""
+    mode = mode or summary_prompt_format()
+    if mode == "pretty":
+        return json.dumps(structured, indent=2)
+    pruned = prune_empty(structured)
+    if mode == "kv":
+        lines = []
+        _kv_lines(pruned, 0, lines)
+        return "\n".join(lines)
+    return json.dumps(pruned, ensure_ascii=False, separators=(",", ":"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English/JSON)."""
+    return (len(text) + 3) // 4
+
+
+def prompt_payload_savings(structured, compact: str) -> dict:
+    """Bytes and estimated tokens of ``compact`` against the old indent=2 dump."""
+    pretty = json.dumps(structured, indent=2)
+    pretty_bytes = len(pretty.encode("utf-8"))
+    compact_bytes = len(compact.encode("utf-8"))
+    return {
+        "pretty_bytes": pretty_bytes,
+        "compact_bytes": compact_bytes,
+        "pretty_tokens_est": estimate_tokens(pretty),
+        "compact_tokens_est": estimate_tokens(compact),
+        "saved_pct": round(100 * (1 - compact_bytes / pretty_bytes), 1) if pretty_bytes else 0.0,
+    }
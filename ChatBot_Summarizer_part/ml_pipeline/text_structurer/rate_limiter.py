@@ -0,0 +1,82 @@
+# text_structurer/rate_limiter.py
+import asyncio
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every Gemini caller in the process.
+
+    ``rate_per_minute`` tokens are added per minute up to ``burst`` (default: one
+    minute's quota, so a quota-sized burst is never delayed). ``acquire()``
+    blocks the calling thread until a token is available; ``acquire_async()``
+    waits with ``asyncio.sleep`` so the event loop keeps serving other requests.
+    Sync and async callers draw from the same bucket.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int | None = None):
+        if rate_per_minute <= 0:
+            raise ValueError(f"rate_per_minute must be positive, got {rate_per_minute}")
+        if burst is not None and burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_minute)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def _try_take(self) -> float:
+        """Take a token if one is available (returns 0), else return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate_per_second
+
+    def acquire(self) -> float:
+        """Take one token, sleeping as needed. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            wait = self._try_take()
+            if wait == 0.0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self) -> float:
+        """Async ``acquire``: never blocks the event loop."""
+        waited = 0.0
+        while True:
+            wait = self._try_take()
+            if wait == 0.0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+_gemini_limiter = None
+_gemini_limiter_lock = threading.Lock()
+
+
+def get_gemini_rate_limiter() -> RateLimiter | None:
+    """
+    Process-wide limiter sized by GEMINI_RPM (requests per minute) and GEMINI_BURST.
+    Opt-in: None when GEMINI_RPM is unset, and 429s are left to the client's backoff.
+    """
+    global _gemini_limiter
+    rpm = os.getenv("GEMINI_RPM")
+    if not rpm:
+        return None
+    with _gemini_limiter_lock:
+        if _gemini_limiter is None:
+            burst = os.getenv("GEMINI_BURST")
+            _gemini_limiter = RateLimiter(float(rpm), burst=int(burst) if burst else None)
+        return _gemini_limiter
@@ -1,8 +1,21 @@
 # text_structurer/utils_json.py
 import re, json
+import threading
+import time
 from json_repair import repair_json
 import os
 
+from ml_pipeline.ingestion.text_normalize import normalize_text
+from ml_pipeline.observability.metrics import record_stage
+
+try:
+    import orjson  # optional: much faster loads for the common (valid JSON) case
+except ImportError:
+    orjson = None
+
+# Inputs larger than this skip the (slow, super-linear) repair tiers.
+REPAIR_MAX_CHARS = int(os.getenv("JSON_REPAIR_MAX_CHARS", "200000"))
+
 def extract_json_strict(text):
     """Extract the first valid JSON object substring from model output.
 
@@ -19,28 +32,110 @@ def extract_json_strict(text):
     try:
         _obj, end = decoder.raw_decode(text[start:])
         return text[start : start + end]
-    except Exception:
+    except ValueError:
+        return None
+
+# ---------------------------------------------------------------------
+# Tiered parsing: cheapest first, repair only when everything else fails
+# ---------------------------------------------------------------------
+def _loads(text):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+def _tier_fast(text):
+    return _loads(text)
+
+def _strip_fence(text):
+    """Body of a ```json ... ``` block, or None if ``text`` isn't fenced."""
+    stripped = text.strip()
+    if not stripped.startswith("```"):
         return None
+    body_start = stripped.find("\n")
+    body_end = stripped.rfind("```")
+    if body_start == -1 or body_end <= body_start:
+        return None
+    return stripped[body_start + 1:body_end]
+
+def _tier_fence(text):
+    body = _strip_fence(text)
+    if body is None:
+        raise ValueError("no markdown fence")
+    return _loads(body)
+
+def _tier_raw_decode(text):
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("no JSON object")
+    obj, _end = json.JSONDecoder().raw_decode(text, start)
+    return obj
+
+def _tier_repair(text):
+    if len(text) > REPAIR_MAX_CHARS:
+        raise ValueError(f"input over {REPAIR_MAX_CHARS} chars, repair skipped")
+    return repair_json(_strip_fence(text) or text, return_objects=True)
+
+PARSE_TIERS = (
+    ("orjson" if orjson is not None else "json", _tier_fast),
+    ("fence", _tier_fence),
+    ("raw_decode", _tier_raw_decode),
+    ("repair", _tier_repair),
+)
+
+_stats_lock = threading.Lock()
+_tier_stats = {}  # tier -> {"used": n, "seconds": cumulative time spent in that tier}
+
+def _record(timings, used):
+    with _stats_lock:
+        for tier, seconds in timings.items():
+            entry = _tier_stats.setdefault(tier, {"used": 0, "seconds": 0.0})
+            entry["seconds"] += seconds
+        if used is not None:
+            _tier_stats.setdefault(used, {"used": 0, "seconds": 0.0})["used"] += 1
+
+def parse_json_tiered(raw_output, tiers=PARSE_TIERS):
+    """
+    Parse LLM output into a dict/list by trying each tier in order.
+    Returns ``(value, info)`` where ``info = {"tier": name or None, "timings": {tier: seconds}}``;
+    ``value`` is None if every tier failed.
+    """
+    info = {"tier": None, "timings": {}}
+    if isinstance(raw_output, bytes):
+        raw_output = raw_output.decode("utf-8", "replace")
+    if not isinstance(raw_output, str):
+        return None, info
+
+    value = None
+    for name, tier in tiers:
+        start = time.perf_counter()
+        try:
+            value = tier(raw_output)
+        except (ValueError, TypeError, RecursionError):
+            value = None
+        info["timings"][name] = time.perf_counter() - start
+        if isinstance(value, (dict, list)):
+            info["tier"] = name
+            break
+        value = None
+    _record(info["timings"], info["tier"])
+    record_stage("json.parse", sum(info["timings"].values()), error=info["tier"] is None, bytes=len(raw_output))
+    if "repair" in info["timings"]:
+        record_stage("json.repair", info["timings"]["repair"], error=info["tier"] is None, bytes=len(raw_output))
+    return value, info
+
+def json_parse_stats():
+    """How often each tier produced the result, and total time spent in it (this process)."""
+    with _stats_lock:
+        return {tier: dict(entry) for tier, entry in _tier_stats.items()}
 
 def validate_and_parse_json(raw_output):
     """Attempts multiple repair methods to return parsed JSON."""
-    try:
-        return json.loads(raw_output)
-    except:
-        try:
-            fixed = repair_json(raw_output)
-            return json.loads(fixed)
-        except:
-            strict = extract_json_strict(raw_output)
-            if strict:
-                return json.loads(strict)
-    return None
+    value, info = parse_json_tiered(raw_output)
+    if info["tier"] is not None and info["tier"] != PARSE_TIERS[0][0]:
+        total_ms = sum(info["timings"].values()) * 1000
+        print(f"[INFO] JSON parsed via '{info['tier']}' tier ({total_ms:.1f} ms)")
+    return value
 
 def clean_unicode(text):
-    replacements = {'\u2013': '-', '\u2014': '-', '\u2019': "'", '\xa0': ' '}
-    for k,v in replacements.items():
-        text = text.replace(k, v)
-    return text.strip()
+    return normalize_text(text)
 
 def quick_normalize_json_string(s: str) -> str:
     """
@@ -100,17 +195,19 @@ def load_structured_json_maybe_repair(path_or_str):
     elif isinstance(path_or_str, str) and os.path.exists(path_or_str):
         with open(path_or_str, "r", encoding="utf-8") as f:
             raw = f.read()
+    elif isinstance(path_or_str, str) and "{" in path_or_str:
+        raw = path_or_str  # fenced / prefixed model output
     else:
         raise ValueError("Input must be dict, JSON string, or valid file path.")
 
-    # Try normal load first
-    try:
-        return json.loads(raw)
-    except Exception as e:
-        # Try to clean/normalize and reload
-        fixed = quick_normalize_json_string(raw)
-        try:
-            return json.loads(fixed)
-        except Exception as e2:
-            # give rich error with both exceptions and the fixed string sample for debugging
-            raise ValueError(f"Failed to parse JSON. Original error: {e}; After fix error: {e2}\n--- FIXED PREVIEW ---\n{fixed[:2000]}")
+    value, info = parse_json_tiered(raw)
+    if value is not None:
+        return value
+
+    # Last resort: regex normalization, then the tiers once more
+    fixed = quick_normalize_json_string(raw)
+    value, _ = parse_json_tiered(fixed)
+    if value is not None:
+        return value
+    tried = ", ".join(info["timings"])
+    raise ValueError(f"Failed to parse JSON (tried {tried}, then normalization)\n--- FIXED PREVIEW ---\n{fixed[:2000]}")
@@ -5,14 +5,16 @@ Unified MediVault pipeline that automates:
 1. PDF ingestion & text extraction
 2. LLM-based structuring using Gemini
 3. Medical summarization
-4. JSON + summary output for downstream use
+4. Persisting the results in the document store for downstream use
 
 Can be executed directly or imported into Flask routes.
 """
 
 import os
-import json
+import time
+from ml_pipeline.ingestion.extraction_cache import sha256_hex
 from ml_pipeline.ingestion.pdf_extractor import extract_text_from_pdf
+from ml_pipeline.storage.document_store import get_document_store
 from ml_pipeline.text_structurer.medical_structurer import call_gemini_structurer
 from ml_pipeline.text_structurer.medical_summarizer import call_gemini_summarizer
 
@@ -20,37 +22,50 @@ from ml_pipeline.text_structurer.medical_summarizer import call_gemini_summarize
 # ---------------------------------------------------------------------
 # Core function
 # ---------------------------------------------------------------------
-def process_pdf(pdf_path: str):
+def process_pdf(pdf_path: str, reuse: bool = True):
     """
     End-to-end automation:
     Extracts text from PDF → structures using LLM → summarizes → saves outputs.
     Returns structured data as dict.
+
+    Outputs are saved in the document store (see ``document_store``) under the
+    PDF's SHA-256, not next to the input. With ``reuse=True`` a document already
+    processed with the current models and prompts is returned from the store.
     """
     if not os.path.exists(pdf_path):
         raise FileNotFoundError(f"File not found: {pdf_path}")
 
-    base_dir = os.path.dirname(pdf_path)
-    print(f"\n[PIPELINE] Starting processing for: {os.path.basename(pdf_path)}")
+    source_name = os.path.basename(pdf_path)
+    print(f"\n[PIPELINE] Starting processing for: {source_name}")
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+    doc_id = sha256_hex(pdf_bytes)
+    store = get_document_store()
+
+    if reuse:
+        stored = store.find_result(doc_id)
+        if stored:
+            print(f"[CACHE] Document {doc_id[:12]} already processed; loaded from the document store.")
+            return stored["structured_data"]
 
     # === Step 1: Extract text ===
     print("[STAGE 1] Extracting text from PDF...")
-    extracted_text = extract_text_from_pdf(pdf_path)
+    start = time.perf_counter()
+    extracted_text = extract_text_from_pdf(pdf_bytes)
 
     # === Step 2: Save raw extraction (for audit/debug) ===
-    extracted_output_path = os.path.join(base_dir, "extracted_text.json")
-    with open(extracted_output_path, "w", encoding="utf-8") as f:
-        json.dump({"extracted_text": extracted_text}, f, indent=4, ensure_ascii=False)
-    print(f"[INFO] Extracted text saved → {extracted_output_path}")
+    store.save(doc_id, source_name=source_name, timings={"extract": time.perf_counter() - start},
+               extracted_text=extracted_text)
+    print(f"[INFO] Extracted text saved → {store.doc_dir(doc_id)}")
 
     # === Step 3: Structuring using Gemini ===
     print("[STAGE 2] Structuring text using Gemini 2.5...")
+    start = time.perf_counter()
     structured_output = call_gemini_structurer(extracted_text)
 
     if structured_output:
-        structured_output_path = os.path.join(base_dir, "structured_output.json")
-        with open(structured_output_path, "w", encoding="utf-8") as f:
-            json.dump(structured_output, f, indent=4, ensure_ascii=False)
-        print(f"[SUCCESS] Structured data saved → {structured_output_path}")
+        store.save(doc_id, timings={"structure": time.perf_counter() - start}, structured=structured_output)
+        print(f"[SUCCESS] Structured data saved for document {doc_id[:12]}")
     else:
         print("[ERROR] Failed to structure text; check logs for details.")
         return None
@@ -58,12 +73,11 @@ def process_pdf(pdf_path: str):
     # === Step 4: Summarization using Gemini ===
     print("[STAGE 3] Generating summary from structured data...")
     try:
-        summary = call_gemini_summarizer(json.dumps(structured_output, indent=2))
+        start = time.perf_counter()
+        summary = call_gemini_summarizer(structured_output)
         if summary:
-            summary_output_path = os.path.join(base_dir, "summary.txt")
-            with open(summary_output_path, "w", encoding="utf-8") as f:
-                f.write(summary)
-            print(f"[SUCCESS] Summary saved → {summary_output_path}")
+            store.save(doc_id, timings={"summarize": time.perf_counter() - start}, summary=summary)
+            print(f"[SUCCESS] Summary saved for document {doc_id[:12]}")
         else:
             print("[ERROR] Summary generation failed.")
     except Exception as e:
@@ -76,10 +90,19 @@ def process_pdf(pdf_path: str):
 # ---------------------------------------------------------------------
 # Optional batch processor
 # ---------------------------------------------------------------------
-def process_folder(folder_path: str):
+def process_folder(folder_path: str, concurrent: bool = False, **batch_kwargs):
     """
     Processes all PDFs in a given folder sequentially.
+
+    With ``concurrent=True`` the folder is handed to ``batch_runner.run_batch``
+    (process-pool extraction, rate-limited Gemini calls, resumable manifest);
+    ``batch_kwargs`` are passed through to it.
     """
+    if concurrent:
+        from batch_runner import run_batch
+
+        return run_batch(folder_path, **batch_kwargs)
+
     pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith(".pdf")]
 
     if not pdf_files:
@@ -104,8 +127,9 @@ if __name__ == "__main__":
     folder_path = r"C:\Users\Hrishikesh Patil\Documents\MiniProject\MediVault\data\Outputs"
 
     SINGLE_FILE_MODE = True
+    CONCURRENT_BATCH = True
 
     if SINGLE_FILE_MODE:
         process_pdf(pdf_path)
     else:
-        process_folder(folder_path)
+        process_folder(folder_path, concurrent=CONCURRENT_BATCH)
@@ -0,0 +1,100 @@
+# tests/conftest.py
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+
+def gemini_json(text: str) -> dict:
+    """A generateContent response whose first candidate says ``text``."""
+    return {"candidates": [{"content": {"parts": [{"text": text}]}, "finishReason": "STOP"}]}
+
+
+def sse_body(*deltas: str) -> bytes:
+    """A streamGenerateContent (alt=sse) body carrying ``deltas``, UTF-8 encoded."""
+    events = "".join(f"data: {json.dumps(gemini_json(d), ensure_ascii=False)}\r\n\r\n" for d in deltas)
+    return events.encode("utf-8")
+
+
+class StubGemini:
+    """
+    Scripted Gemini endpoint. Each request gets the next queued reply
+    ``(status, body, headers, delay)``; the last one repeats once the queue is empty.
+    """
+
+    def __init__(self):
+        self.replies = []
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1beta"
+
+    def reply(self, status=200, body=None, headers=None, delay=0.0):
+        if isinstance(body, dict):
+            body = json.dumps(body).encode("utf-8")
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+        self.replies.append((status, body or b"", headers or {}, delay))
+        return self
+
+    def _next_reply(self):
+        with self._lock:
+            return self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                stub.requests.append({"path": self.path, "time": time.monotonic(),
+                                      "body": json.loads(self.rfile.read(length) or b"null")})
+                status, body, headers, delay = stub._next_reply()
+                if delay:
+                    time.sleep(delay)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # client timed out and hung up
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def gemini_stub(monkeypatch):
+    """A running ``StubGemini`` that the Gemini clients point at, with the rate limiter off."""
+    stub = StubGemini().start()
+    monkeypatch.setenv("GEMINI_API_BASE", stub.url)
+    monkeypatch.delenv("GEMINI_RPM", raising=False)
+    yield stub
+    stub.stop()
@@ -0,0 +1,71 @@
+from ml_pipeline.text_structurer.chunking import PAGE_BREAK, merge_structured, split_into_chunks
+
+
+# ---------------------------------------------------------------------
+# split_into_chunks
+# ---------------------------------------------------------------------
+def test_short_text_is_one_chunk():
+    assert split_into_chunks("  Admission note\nstable\n", 1000) == ["Admission note\nstable"]
+
+
+def test_chunks_respect_max_chars_and_keep_all_text():
+    page = "HISTORY\n" + "Patient reports mild pain.\n" * 20 + "\nPLAN\n" + "Continue current plan.\n" * 20
+    text = PAGE_BREAK.join([page] * 5)
+    chunks = split_into_chunks(text, 400)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    assert " ".join(chunks).split() == text.replace(PAGE_BREAK, " ").split()
+
+
+def test_splits_on_page_breaks_and_section_headers_first():
+    first = "Discharge Summary\n" + "a" * 50
+    second = "MEDICATIONS:\n" + "b" * 50
+    chunks = split_into_chunks(first + "\n" + second + PAGE_BREAK + "c" * 50, 90)
+
+    assert chunks == [first, second, "c" * 50]
+
+
+def test_oversized_line_is_hard_cut():
+    chunks = split_into_chunks("x" * 250, 100)
+    assert chunks == ["x" * 100, "x" * 100, "x" * 50]
+
+
+# ---------------------------------------------------------------------
+# merge_structured
+# ---------------------------------------------------------------------
+def test_merge_concatenates_notes_and_unions_other_lists():
+    parts = [
+        {"progress_notes": [{"note": "day 1"}], "allergies": ["penicillin"]},
+        {"progress_notes": [{"note": "day 1"}, {"note": "day 2"}], "allergies": ["latex", "penicillin"]},
+    ]
+    merged = merge_structured(parts)
+
+    assert merged["progress_notes"] == [{"note": "day 1"}, {"note": "day 1"}, {"note": "day 2"}]
+    assert merged["allergies"] == ["penicillin", "latex"]
+
+
+def test_merge_fills_empty_scalars_first_value_wins():
+    parts = [
+        {"patient_information": {"name": "Jane Doe", "age": None, "mrn": ""}},
+        {"patient_information": {"name": "J. Doe", "age": 54, "mrn": "123"}},
+        {"patient_information": {"age": 55}},
+    ]
+    assert merge_structured(parts) == {"patient_information": {"name": "Jane Doe", "age": 54, "mrn": "123"}}
+
+
+def test_merge_drops_placeholder_entries_and_skips_non_dicts():
+    parts = [
+        {"lab_reports": [{"test": None, "value": None}, {"test": "Hb", "value": 13.1}]},
+        None,
+        "not json",
+    ]
+    assert merge_structured(parts) == {"lab_reports": [{"test": "Hb", "value": 13.1}]}
+
+
+def test_merge_does_not_modify_inputs():
+    first = {"allergies": ["penicillin"], "patient_information": {"age": None}}
+    second = {"allergies": ["latex"], "patient_information": {"age": 54}}
+    merge_structured([first, second])
+
+    assert first == {"allergies": ["penicillin"], "patient_information": {"age": None}}
@@ -0,0 +1,121 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT_DIR
+from ml_pipeline.storage import document_store
+from ml_pipeline.storage.document_store import DocumentStore, is_doc_id
+
+DOC_ID = "ab" + "0" * 62
+STRUCTURED = {"patient_information": {"patient_name": "Zoë Doe"}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DocumentStore(tmp_path / "documents")
+
+
+def saved(store):
+    store.save(DOC_ID, source_name="report.pdf", timings={"extract": 1.23456},
+               extracted_text="Patient: Zoë Doe", structured=STRUCTURED, summary="- Stable.")
+    return store
+
+
+def test_save_load_round_trip(store):
+    metadata = saved(store).metadata(DOC_ID)
+
+    assert store.load(DOC_ID, "extracted_text") == "Patient: Zoë Doe"
+    assert store.load(DOC_ID, "structured") == STRUCTURED
+    assert store.get(DOC_ID)["summary"] == "- Stable."
+    assert metadata["source_name"] == "report.pdf"
+    assert metadata["timings"] == {"extract": 1.2346}
+    assert set(metadata["artifacts"]) == {"extracted_text", "structured", "summary"}
+    assert metadata["pipeline"] == document_store.pipeline_info()
+
+
+def test_overwrite_replaces_files_and_keeps_other_artifacts(store):
+    saved(store).save(DOC_ID, summary="- Improving.", timings={"summarize": 2.0})
+
+    assert store.load(DOC_ID, "summary") == "- Improving."
+    assert store.load(DOC_ID, "structured") == STRUCTURED
+    assert set(store.metadata(DOC_ID)["timings"]) == {"extract", "summarize"}
+    assert not [name for name in os.listdir(store.doc_dir(DOC_ID)) if name.endswith(".tmp")]
+
+
+def test_failed_write_leaves_previous_file(store, monkeypatch):
+    saved(store)
+
+    def broken_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(document_store.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        store.save(DOC_ID, summary="- Partial")
+    monkeypatch.undo()
+
+    assert store.load(DOC_ID, "summary") == "- Stable."
+    assert not [name for name in os.listdir(store.doc_dir(DOC_ID)) if name.endswith(".tmp")]
+
+
+def test_unknown_documents_and_ids(store):
+    assert store.get(DOC_ID) is None
+    assert store.find_result(DOC_ID) is None
+    assert not is_doc_id("../etc/passwd")
+    with pytest.raises(ValueError):
+        store.doc_dir("../etc/passwd")
+    with pytest.raises(ValueError):
+        store.save(DOC_ID, transcript="...")
+
+
+def test_find_result_needs_structured_and_summary(store):
+    store.save(DOC_ID, structured=STRUCTURED)
+    assert store.find_result(DOC_ID) is None
+
+    store.save(DOC_ID, summary="- Stable.")
+    assert store.find_result(DOC_ID) == {"summary": "- Stable.", "structured_data": STRUCTURED}
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda mp: mp.setattr(document_store, "STRUCTURER_MODEL", "gemini-next"),
+        lambda mp: mp.setattr(document_store, "SUMMARIZER_MODEL", "gemini-next"),
+        lambda mp: mp.setattr(document_store, "PROMPT_VERSION", "0123456789ab"),
+        lambda mp: mp.setenv("SUMMARY_PROMPT_FORMAT", "kv"),
+        lambda mp: mp.setenv("STRUCTURER_SCHEMA_PRUNING", "0"),
+    ],
+    ids=["structurer model", "summarizer model", "prompt version", "summary format", "schema pruning"],
+)
+def test_pipeline_change_invalidates_stored_result(store, monkeypatch, change):
+    monkeypatch.delenv("SUMMARY_PROMPT_FORMAT", raising=False)
+    monkeypatch.delenv("STRUCTURER_SCHEMA_PRUNING", raising=False)
+    assert saved(store).find_result(DOC_ID) is not None
+
+    change(monkeypatch)
+
+    assert store.find_result(DOC_ID) is None
+    assert store.get(DOC_ID)["structured"] == STRUCTURED  # still readable by id
+
+
+def test_store_imports_without_the_gemini_stack():
+    # chatbot_backend imports the store but does not install requests / orjson / json_repair.
+    code = (
+        "import json, sys; import ml_pipeline.storage.document_store; "
+        "print(json.dumps(sorted(m for m in sys.modules if m.split('.')[0] in "
+        "('requests', 'httpx', 'orjson', 'json_repair', 'fitz', 'numpy'))))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout) == []
+
+
+def test_chatbot_query_route_imports_on_its_own():
+    pytest.importorskip("groq")  # chatbot.llm's own dependency
+    result = subprocess.run(
+        [sys.executable, "-c", "import chatbot_backend.app.routes.query"], cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,114 @@
+import asyncio
+import email.utils
+import time
+
+import pytest
+
+from conftest import gemini_json, sse_body
+from ml_pipeline.text_structurer.gemini_client import (
+    AsyncGeminiClient,
+    GeminiClient,
+    GeminiError,
+    backoff_delay,
+    parse_retry_after,
+)
+
+OK = gemini_json('{"ok": true}')
+
+
+def fast_client(cls=GeminiClient, **kwargs):
+    kwargs = {"retries": 3, "backoff_base": 0.01, "backoff_cap": 5.0, "timeout": (1.0, 2.0), **kwargs}
+    return cls("test-key", **kwargs)
+
+
+def gaps(stub) -> list[float]:
+    times = [request["time"] for request in stub.requests]
+    return [b - a for a, b in zip(times, times[1:])]
+
+
+# ---------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    http_date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= parse_retry_after(http_date) <= 30
+
+
+def test_backoff_delay_is_capped_and_honours_retry_after():
+    for attempt in range(1, 10):
+        assert 0 <= backoff_delay(attempt, base=2.0, cap=10.0) <= min(10.0, 2.0 * 2 ** (attempt - 1))
+    assert backoff_delay(1, base=0.01, cap=10.0, retry_after=4.0) >= 4.0
+    assert backoff_delay(1, base=0.01, cap=10.0, retry_after=60.0) == 10.0
+
+
+# ---------------------------------------------------------------------
+# Retries against the stub server
+# ---------------------------------------------------------------------
+def test_retries_server_errors_then_succeeds(gemini_stub):
+    gemini_stub.reply(503, "overloaded").reply(500, "oops").reply(200, OK)
+
+    assert fast_client().generate("prompt", {}) == OK
+    assert len(gemini_stub.requests) == 3
+    assert gemini_stub.requests[0]["body"]["contents"][0]["parts"][0]["text"] == "prompt"
+
+
+def test_non_retryable_status_fails_immediately(gemini_stub):
+    gemini_stub.reply(400, "bad request")
+
+    with pytest.raises(GeminiError) as error:
+        fast_client().generate("prompt", {})
+    assert error.value.status_code == 400
+    assert len(gemini_stub.requests) == 1
+
+
+def test_gives_up_after_retries(gemini_stub):
+    gemini_stub.reply(429, "quota")
+
+    with pytest.raises(GeminiError) as error:
+        fast_client(retries=2).generate("prompt", {})
+    assert error.value.status_code == 429
+    assert len(gemini_stub.requests) == 2
+
+
+def test_retry_after_is_honoured(gemini_stub):
+    gemini_stub.reply(429, "quota", {"Retry-After": "1"}).reply(200, OK)
+
+    assert fast_client().generate("prompt", {}) == OK
+    assert gaps(gemini_stub)[0] >= 0.95
+
+
+def test_read_timeout_is_retried(gemini_stub):
+    gemini_stub.reply(200, OK, delay=1.0).reply(200, OK)
+    client = fast_client(timeout=(1.0, 0.2))
+
+    start = time.monotonic()
+    assert client.generate("prompt", {}) == OK
+    assert len(gemini_stub.requests) == 2
+    assert time.monotonic() - start < 1.0
+
+
+def test_stream_retries_until_the_stream_opens(gemini_stub):
+    gemini_stub.reply(503, "overloaded", {"Retry-After": "0"}).reply(
+        200, sse_body("a", "b"), {"Content-Type": "text/event-stream"}
+    )
+
+    assert list(fast_client().stream_generate("prompt", {})) == ["a", "b"]
+    assert len(gemini_stub.requests) == 2
+
+
+def test_async_client_retries_and_times_out(gemini_stub):
+    gemini_stub.reply(429, "quota", {"Retry-After": "0"}).reply(200, OK, delay=1.0).reply(200, OK)
+
+    async def run():
+        client = fast_client(AsyncGeminiClient, timeout=(1.0, 0.2))
+        try:
+            return await client.generate("prompt", {})
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == OK
+    assert len(gemini_stub.requests) == 3
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from conftest import sse_body
+from ml_pipeline.text_structurer.gemini_client import AsyncGeminiClient, GeminiClient
+from ml_pipeline.text_structurer.medical_structurer import stream_gemini_structurer
+
+DELTAS = ("Température 38,5 °C – ", "Zoë Müller, 25 µg/dL ", "→ stable “noted”")
+
+CONTENT_TYPES = {
+    "charset": {"Content-Type": "text/event-stream; charset=utf-8"},
+    "no charset": {"Content-Type": "text/event-stream"},
+    "no content type": {},
+}
+
+
+@pytest.mark.parametrize("headers", CONTENT_TYPES.values(), ids=CONTENT_TYPES.keys())
+def test_stream_generate_decodes_utf8(gemini_stub, headers):
+    gemini_stub.reply(200, sse_body(*DELTAS), headers)
+    client = GeminiClient("test-key", retries=1)
+
+    assert list(client.stream_generate("prompt", {})) == list(DELTAS)
+    assert gemini_stub.requests[0]["path"].endswith(":streamGenerateContent?alt=sse")
+
+
+@pytest.mark.parametrize("headers", CONTENT_TYPES.values(), ids=CONTENT_TYPES.keys())
+def test_async_stream_generate_decodes_utf8(gemini_stub, headers):
+    gemini_stub.reply(200, sse_body(*DELTAS), headers)
+
+    async def collect():
+        client = AsyncGeminiClient("test-key", retries=1)
+        try:
+            return [delta async for delta in client.stream_generate("prompt", {})]
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(collect()) == list(DELTAS)
+
+
+@pytest.mark.parametrize("headers", CONTENT_TYPES.values(), ids=CONTENT_TYPES.keys())
+def test_stream_structurer_keeps_non_ascii(gemini_stub, monkeypatch, headers):
+    monkeypatch.setenv("GEMINI_API_KEY_STRUCTURER", "test-key")
+    gemini_stub.reply(200, sse_body('{"patient_information": {"name": "Zo', 'ë Müller", ', '"city": "Köln"}}'), headers)
+    events = []
+
+    parsed = stream_gemini_structurer("Patient: Zoë Müller", on_event=events.append, use_cache=False)
+
+    assert parsed["patient_information"] == {"name": "Zoë Müller", "city": "Köln"}
+    assert events
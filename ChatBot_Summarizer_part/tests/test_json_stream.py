@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from ml_pipeline.text_structurer.json_stream import IncrementalJSONParser
+
+DOCUMENT = {
+    "patient_information": {"name": "Zoë Doe", "note": "says \"fine\", {ok} [1]"},
+    "progress_notes": [{"date": "2024-01-01", "note": "stable"}, {"date": "2024-01-02", "note": "improving"}],
+    "lab_reports": [],
+    "age": 54,
+    "allergies": ["penicillin", "latex"],
+    "discharged": True,
+    "follow_up": None,
+}
+TEXT = "Here is the JSON:\n```json\n" + json.dumps(DOCUMENT, indent=2, ensure_ascii=False) + "\n```"
+
+
+def feed_in_pieces(parser, text, size):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 3, 17, len(TEXT)])
+def test_events_do_not_depend_on_chunking(size):
+    parser = IncrementalJSONParser()
+    events = feed_in_pieces(parser, TEXT, size)
+
+    sections = {event["key"]: event["value"] for event in events if event["type"] == "section"}
+    items = [(event["key"], event["index"], event["value"]) for event in events if event["type"] == "item"]
+    assert sections == DOCUMENT
+    assert items == [
+        ("progress_notes", 0, DOCUMENT["progress_notes"][0]),
+        ("progress_notes", 1, DOCUMENT["progress_notes"][1]),
+    ]
+    assert parser.done
+    assert parser.text == TEXT[:len(parser.text)]
+
+
+def test_items_are_emitted_before_the_list_closes():
+    parser = IncrementalJSONParser()
+    events = parser.feed('{"progress_notes": [{"note": "a"}, {"note": "b"}')
+
+    assert [event["type"] for event in events] == ["item", "item"]
+    assert parser.feed("]}") == [{"type": "section", "key": "progress_notes",
+                                  "value": [{"note": "a"}, {"note": "b"}]}]
+
+
+def test_nothing_is_fed_after_the_object_closes():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 1}')
+
+    assert parser.done
+    assert parser.feed('{"b": 2}') == []
+
+
+def test_malformed_values_are_skipped():
+    parser = IncrementalJSONParser()
+    events = parser.feed('{"a": tru, "b": 2}')
+
+    assert events == [{"type": "section", "key": "b", "value": 2}]
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from conftest import gemini_json
+from ml_pipeline.text_structurer import llm_cache
+from ml_pipeline.text_structurer.llm_cache import LLMCache, cache_key, get_llm_cache, llm_cache_stats
+from ml_pipeline.text_structurer.medical_summarizer import call_gemini_summarizer
+
+CONFIG = {"temperature": 0.2, "maxOutputTokens": 4000}
+
+
+@pytest.fixture
+def cache_env(tmp_path, monkeypatch):
+    """LLM_CACHE_PATH in ``tmp_path`` and a fresh process-wide cache."""
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm_cache.sqlite"))
+    monkeypatch.delenv("LLM_CACHE_BYPASS", raising=False)
+    monkeypatch.setattr(llm_cache, "_default_cache", None)
+    return tmp_path
+
+
+# ---------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------
+def test_cache_key_is_stable():
+    key = cache_key("gemini-2.5-flash", CONFIG, "Summarize: Zoë Doe")
+
+    assert key == cache_key("gemini-2.5-flash", dict(reversed(CONFIG.items())), "Summarize: Zoë Doe")
+    assert key != cache_key("gemini-2.5-flash", CONFIG, "Summarize: Zoë Doe.")
+    assert key != cache_key("gemini-2.5-pro", CONFIG, "Summarize: Zoë Doe")
+    assert key != cache_key("gemini-2.5-flash", {**CONFIG, "temperature": 0.1}, "Summarize: Zoë Doe")
+
+
+# ---------------------------------------------------------------------
+# TTL / LRU
+# ---------------------------------------------------------------------
+def test_entries_expire_after_ttl(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), ttl_seconds=0.2)
+    cache.put("k", "summary", kind="summarizer")
+    assert cache.get("k", kind="summarizer") == "summary"
+
+    time.sleep(0.3)
+    assert cache.get("k", kind="summarizer") is None
+    assert cache.stats()["by_kind"]["summarizer"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), max_bytes=25)
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    assert cache.get("a") is not None  # "b" is now the least recently used
+
+    cache.put("c", "z" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10 and cache.get("c") == "z" * 10
+    assert cache.stats()["size_bytes"] == 20
+
+
+def test_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    LLMCache(path).put("k", "summary")
+    assert LLMCache(path).get("k") == "summary"
+
+
+# ---------------------------------------------------------------------
+# Switches
+# ---------------------------------------------------------------------
+def test_cache_is_off_without_path_or_when_bypassed(cache_env, monkeypatch):
+    assert get_llm_cache() is not None
+    assert get_llm_cache(use_cache=False) is None
+
+    monkeypatch.setenv("LLM_CACHE_BYPASS", "1")
+    assert get_llm_cache() is None
+
+    monkeypatch.delenv("LLM_CACHE_BYPASS")
+    monkeypatch.delenv("LLM_CACHE_PATH")
+    assert get_llm_cache() is None
+
+
+def test_second_call_is_served_from_cache(cache_env, gemini_stub, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY_SUMMARIZER", "test-key")
+    gemini_stub.reply(200, gemini_json("Stable, discharged home."))
+    record = {"patient_information": {"name": "Jane Doe"}, "allergies": ["penicillin"]}
+
+    assert call_gemini_summarizer(record) == "Stable, discharged home."
+    assert call_gemini_summarizer(record) == "Stable, discharged home."
+    assert len(gemini_stub.requests) == 1
+    stats = llm_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    # Bypassing (env or argument) goes back to the API.
+    call_gemini_summarizer(record, use_cache=False)
+    monkeypatch.setenv("LLM_CACHE_BYPASS", "1")
+    call_gemini_summarizer(record)
+    assert len(gemini_stub.requests) == 3
@@ -0,0 +1,13 @@
+from ml_pipeline.observability.metrics import render_cache_counters
+
+
+def test_cache_counters_use_per_kind_counts_when_available():
+    llm = {"hits": 3, "misses": 2, "by_kind": {"structurer": {"hits": 1, "misses": 2}, "summarizer": {"hits": 2, "misses": 0}}}
+    extraction = {"hits": 12, "misses": 4, "hit_rate": 0.75}
+    lines = render_cache_counters({"llm": llm, "extraction": extraction, "unused": None}).splitlines()
+
+    assert "# TYPE medivault_cache_hits_total counter" in lines
+    assert 'medivault_cache_hits_total{cache="extraction",kind="all"} 12' in lines
+    assert 'medivault_cache_hits_total{cache="llm",kind="summarizer"} 2' in lines
+    assert 'medivault_cache_misses_total{cache="llm",kind="structurer"} 2' in lines
+    assert not any('cache="unused"' in line for line in lines)
@@ -0,0 +1,52 @@
+import sys
+import threading
+import types
+
+from ml_pipeline.ingestion.ocr_runtime import OcrRuntime
+
+
+def test_status_not_loaded_until_reader_is_built(monkeypatch):
+    building = threading.Event()
+    release = threading.Event()
+
+    class SlowReader:
+        def __init__(self, languages, gpu=False, verbose=True):
+            self.languages = languages
+            building.set()
+            release.wait(5)
+
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=SlowReader))
+    runtime = OcrRuntime(("en", "fr"), pool_size=1)
+    thread = threading.Thread(target=runtime.preload)
+    thread.start()
+    try:
+        assert building.wait(5)
+        status = runtime.status()
+        assert not status["loaded"]
+        assert status["loading"]
+        assert status["readers"] == 0
+    finally:
+        release.set()
+        thread.join(5)
+
+    status = runtime.status()
+    assert status["loaded"] and not status["loading"]
+    assert status["readers"] == 1
+    with runtime.acquire() as reader:
+        assert reader.languages == ["en", "fr"]
+
+
+def test_failed_build_is_not_loaded(monkeypatch):
+    def broken_reader(*args, **kwargs):
+        raise RuntimeError("model download failed")
+
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=broken_reader))
+    runtime = OcrRuntime(("en",), pool_size=1)
+    try:
+        runtime.preload()
+    except RuntimeError:
+        pass
+
+    status = runtime.status()
+    assert not status["loaded"]
+    assert status["error"] == "model download failed"
@@ -0,0 +1,138 @@
+import pytest
+
+from ml_pipeline.ingestion.pdf_extractor import (
+    METHOD_HYBRID,
+    METHOD_OCR,
+    METHOD_TEXT,
+    ExtractionConfig,
+    _choose_method,
+    _finish_page,
+    _ocr_lines,
+    _render_jobs,
+)
+
+CONFIG = ExtractionConfig()
+
+
+@pytest.mark.parametrize(
+    "words, text_density, image_coverage, expected",
+    [
+        (360, 27.0, 0.0, METHOD_TEXT),     # full page of body text
+        (5, 0.2, 0.0, METHOD_OCR),         # scan with a stray text layer
+        (30, 1.0, 0.0, METHOD_HYBRID),     # too few words to trust
+        (360, 27.0, 0.6, METHOD_HYBRID),   # text around a scanned insert
+        (60, 1.5, 0.0, METHOD_HYBRID),     # enough words, but only a header on a large page
+    ],
+)
+def test_choose_method(words, text_density, image_coverage, expected):
+    assert _choose_method(words, text_density, image_coverage, CONFIG) == expected
+
+
+def test_choose_method_density_threshold_is_configurable(monkeypatch):
+    monkeypatch.setenv("OCR_MIN_TEXT_DENSITY", "1")
+    config = ExtractionConfig.from_env()
+
+    assert _choose_method(60, 1.5, 0.0, config) == METHOD_TEXT
+    assert config.cache_fingerprint() != CONFIG.cache_fingerprint()
+
+
+@pytest.mark.parametrize("ocr_mode, expected", [("never", METHOD_TEXT), ("always", METHOD_HYBRID)])
+def test_choose_method_forced_modes(ocr_mode, expected):
+    config = ExtractionConfig(ocr_mode=ocr_mode)
+    assert _choose_method(5, 0.1, 0.9, config) == expected
+
+
+def _box(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+def test_ocr_lines_groups_boxes_into_rows():
+    results = [
+        (_box(200, 2, 320, 14), "Jane Doe", 0.9),
+        (_box(10, 0, 120, 12), "Name:", 0.9),
+        (_box(10, 30, 150, 42), "DOB: 01/02/1960", 0.8),
+        (_box(10, 60, 90, 72), "Signed", 0.7),
+        (_box(100, 61, 200, 73), "Dr. Smith", 0.7),
+    ]
+    assert _ocr_lines(results) == "Name: Jane Doe\nDOB: 01/02/1960\nSigned Dr. Smith"
+
+
+def test_ocr_lines_empty():
+    assert _ocr_lines([]) == ""
+
+
+def _hybrid_page():
+    import fitz
+
+    doc = fitz.open()
+    page = doc.new_page(width=612, height=792)
+    page.insert_text((72, 72), "Scanned letter", fontsize=12)
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 40, 40), False)
+    pix.clear_with(200)
+    page.insert_image(fitz.Rect(72, 300, 540, 600), pixmap=pix)
+    return doc, page
+
+
+def _hybrid_record(text_layer, text_source):
+    return {
+        "page": 1,
+        "method": METHOD_HYBRID,
+        "text_layer": text_layer,
+        "text_source": text_source,
+        "ocr_text": "",
+        "text": "",
+        "timings": {"analyze": 0.0},
+    }
+
+
+def _run_region_ocr(page, record, ocr_text):
+    jobs = _render_jobs(page, record, CONFIG)
+    for _, slot, _, _ in jobs:
+        record["_segments"][slot]["text"] = ocr_text
+    return _finish_page(record, CONFIG)
+
+
+def test_region_ocr_keeps_pdfplumber_fallback_text():
+    doc, page = _hybrid_page()
+    fallback = "Scanned letter from Dr. Smith regarding follow-up visit"
+    record = _run_region_ocr(page, _hybrid_record(fallback, "pdfplumber"), "Handwritten: allergic to penicillin")
+    doc.close()
+
+    assert record["ocr_regions"] == 1
+    assert record["text"] == fallback + "\nHandwritten: allergic to penicillin"
+
+
+def test_region_ocr_interleaves_text_layer_blocks():
+    doc, page = _hybrid_page()
+    record = _run_region_ocr(page, _hybrid_record("Scanned letter", "pymupdf"), "Handwritten: allergic to penicillin")
+    doc.close()
+
+    assert record["text"] == "Scanned letter\nHandwritten: allergic to penicillin"
+
+
+def _text_pdf(pages: int, label: str) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=612, height=792)
+        page.insert_text((72, 72), f"{label} page {i + 1}: " + "patient stable vitals normal " * 3, fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_parallel_extraction_reuses_one_pool():
+    from ml_pipeline.ingestion import pdf_extractor
+
+    config = ExtractionConfig(ocr_mode="never", ocr_batch_pages=2)
+    pools = []
+    for label in ("first", "second"):
+        pdf_bytes = _text_pdf(5, label)
+        serial = pdf_extractor.extract_text_from_pdf(pdf_bytes, workers=1, config=config, use_cache=False)
+        parallel = pdf_extractor.extract_text_from_pdf(pdf_bytes, workers=2, config=config, use_cache=False)
+        assert parallel == serial
+        assert f"{label} page 5" in parallel
+        pools.append(pdf_extractor._pool)
+
+    assert pools[0] is not None and pools[0] is pools[1]
@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+import pytest
+
+from ml_pipeline.text_structurer import rate_limiter
+from ml_pipeline.text_structurer.rate_limiter import RateLimiter, get_gemini_rate_limiter
+
+
+@pytest.mark.parametrize("rpm", [0, -5])
+def test_rejects_non_positive_rate(rpm):
+    with pytest.raises(ValueError):
+        RateLimiter(rpm)
+
+
+def test_rejects_empty_burst():
+    with pytest.raises(ValueError):
+        RateLimiter(60, burst=0)
+
+
+def test_default_burst_is_one_minute_of_quota():
+    limiter = RateLimiter(10)
+    start = time.monotonic()
+    for _ in range(10):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
+
+
+def test_waits_once_the_burst_is_spent():
+    limiter = RateLimiter(600, burst=1)  # one token every 0.1s
+    limiter.acquire()
+    start = time.monotonic()
+    limiter.acquire()
+    asyncio.run(limiter.acquire_async())
+    assert time.monotonic() - start >= 0.15
+
+
+def test_gemini_limiter_is_opt_in(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_gemini_limiter", None)
+    monkeypatch.delenv("GEMINI_RPM", raising=False)
+    assert get_gemini_rate_limiter() is None
+
+    monkeypatch.setenv("GEMINI_RPM", "120")
+    monkeypatch.setenv("GEMINI_BURST", "5")
+    limiter = get_gemini_rate_limiter()
+    assert limiter.capacity == 5 and limiter.rate_per_second == 2.0
+    assert get_gemini_rate_limiter() is limiter
@@ -0,0 +1,40 @@
+from ml_pipeline.ingestion.text_dedupe import novel_ocr_text
+
+REFERENCE = (
+    "Discharge Summary\n"
+    "Name: Jane Doe\n"
+    "Patient stable, vitals within normal limits, continue current medication plan.\n"
+    "Glucose 98 mg/dL"
+)
+
+
+def test_lines_matching_the_text_layer_are_dropped():
+    ocr = "DISCHARGE SUMMARY\nName Jane Doe\nglucose 98 mg dl"
+    assert novel_ocr_text(REFERENCE, ocr) == ""
+
+
+def test_short_novel_line_is_kept():
+    ocr = "Discharge Summary\nSigned: Dr. Smith"
+    assert novel_ocr_text(REFERENCE, ocr) == "Signed: Dr. Smith"
+
+
+def test_shingles_drop_covered_words_within_a_line():
+    ocr = "Patient stable, vitals within normal limits. Allergic to penicillin, noted by hand"
+    assert novel_ocr_text(REFERENCE, ocr) == "Allergic to penicillin, noted by hand"
+
+
+def test_covered_line_split_differently_is_dropped():
+    ocr = "Patient stable, vitals within\nnormal limits, continue current medication plan."
+    assert novel_ocr_text(REFERENCE, ocr) == ""
+
+
+def test_single_uncovered_word_is_treated_as_noise():
+    # "vltals" is a misread of "vitals": one uncovered word between covered runs.
+    ocr = "Name: Jane Doe Patient stable, vltals within normal limits, continue current medication plan."
+    assert novel_ocr_text(REFERENCE, ocr, min_novel_words=2) == ""
+
+
+def test_empty_reference_keeps_all_ocr_text():
+    ocr = "Handwritten note\nsecond line"
+    assert novel_ocr_text("", ocr) == ocr
+    assert novel_ocr_text("   \n", ocr) == ocr
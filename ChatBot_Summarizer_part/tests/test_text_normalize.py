@@ -0,0 +1,24 @@
+import pytest
+
+from ml_pipeline.ingestion.text_normalize import NORMALIZATION_TABLE, normalize_text
+
+REFERENCE = str.maketrans(NORMALIZATION_TABLE)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "  plain ASCII\n",
+        "Dose – ½ tab “once daily”, patient’s ﬁle\xa0— noted",  # common characters only
+        "Temp 37.1 °C, Vit D 25 µg, m²",                       # Latin-1 left as-is
+        "eGFR ≥ 60 mL/min → stable",                           # wide, nothing to replace
+        "Ｎａｍｅ：　Doe ≥ 60 mL​ ﬀ ‘x’ \U0001f600",  # wide table entries + astral
+    ],
+)
+def test_matches_table(text):
+    assert normalize_text(text) == text.translate(REFERENCE).strip()
+
+
+def test_every_table_entry_is_applied():
+    text = "|".join(NORMALIZATION_TABLE) + " ≥"
+    assert normalize_text(text) == "|".join(NORMALIZATION_TABLE.values()) + " ≥"
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from ml_pipeline.text_structurer import utils_json
+from ml_pipeline.text_structurer.utils_json import PARSE_TIERS, parse_json_tiered
+
+RECORD = {"patient_information": {"name": "Zoë Doe", "age": 54}, "allergies": ["penicillin"]}
+CLEAN = json.dumps(RECORD, ensure_ascii=False)
+FAST_TIER = PARSE_TIERS[0][0]  # "orjson" when installed, else "json"
+
+
+@pytest.mark.parametrize(
+    "raw, tier",
+    [
+        (CLEAN, FAST_TIER),
+        (CLEAN.encode("utf-8"), FAST_TIER),
+        ("```json\n" + json.dumps(RECORD, indent=2) + "\n```", "fence"),
+        ("Here is the JSON:\n" + CLEAN + "\nLet me know if you need anything else.", "raw_decode"),
+        ("```json\n" + CLEAN + "\n```\nNotes: ages are estimates.", "fence"),
+        (CLEAN[:-2], "repair"),  # cut off mid-object
+    ],
+)
+def test_first_tier_that_parses_wins(raw, tier):
+    value, info = parse_json_tiered(raw)
+
+    assert info["tier"] == tier
+    assert value["patient_information"]["name"] == "Zoë Doe"
+    # Later tiers are not tried once one succeeds.
+    names = [name for name, _ in PARSE_TIERS]
+    assert list(info["timings"]) == names[:names.index(tier) + 1]
+
+
+def test_repair_is_skipped_above_max_chars(monkeypatch):
+    def fail_repair(*args, **kwargs):
+        raise AssertionError("repair_json called")
+
+    monkeypatch.setattr(utils_json, "REPAIR_MAX_CHARS", len(CLEAN) - 10)
+    monkeypatch.setattr(utils_json, "repair_json", fail_repair)
+    value, info = parse_json_tiered(CLEAN[:-2])
+
+    assert value is None and info["tier"] is None
+    assert "repair" in info["timings"]
+
+
+@pytest.mark.parametrize("raw", ["", "not json at all", "<html>503 Service Unavailable</html>", b"\xff\xfe", None, 42])
+def test_garbage_returns_none_without_raising(raw):
+    value, info = parse_json_tiered(raw)
+
+    assert value is None
+    assert info["tier"] is None